@@ -0,0 +1,59 @@
+"""
+Contract Labour Attendance De-duplication
+One-off migration for attendance written before the unique (worker_id, date)
+index existed, when re-marking a day stored a second entry. Startup skips that
+index while such duplicates remain.
+
+Usage:
+    python dedupe_contract_attendance.py           # report duplicates only
+    python dedupe_contract_attendance.py --apply   # back up and remove them
+
+The newest entry of each worker/day (by created_at) is kept. Every removed
+entry is first copied, with a removed_at timestamp, to
+contract_worker_attendance_removed.
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timezone
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from services.indexes import duplicates_pipeline
+
+# Connect to MongoDB
+mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+db_name = os.environ.get('DB_NAME', 'test_database')
+
+client = AsyncIOMotorClient(mongo_url)
+db = client[db_name]
+
+
+async def main(apply: bool):
+    attendance = db.contract_worker_attendance
+    backup = db.contract_worker_attendance_removed
+    pipeline = duplicates_pipeline(["worker_id", "date"], [("created_at", -1), ("_id", -1)])
+
+    groups = 0
+    removed = 0
+    async for group in attendance.aggregate(pipeline, allowDiskUse=True):
+        groups += 1
+        keep, stale = group["ids"][0], group["ids"][1:]
+        print(f"{group['_id']['worker_id']} on {group['_id']['date']}: "
+              f"keeping {keep}, {'removing' if apply else 'would remove'} "
+              f"{', '.join(str(_id) for _id in stale)}")
+        if not apply:
+            continue
+        docs = await attendance.find({"_id": {"$in": stale}}).to_list(None)
+        now = datetime.now(timezone.utc).isoformat()
+        await backup.insert_many([{**doc, "removed_at": now} for doc in docs])
+        result = await attendance.delete_many({"_id": {"$in": stale}})
+        removed += result.deleted_count
+
+    if apply:
+        print(f"{groups} duplicated worker/days, {removed} entries moved to {backup.name}")
+    else:
+        print(f"{groups} duplicated worker/days; re-run with --apply to remove them")
+
+
+if __name__ == "__main__":
+    asyncio.run(main("--apply" in sys.argv[1:]))
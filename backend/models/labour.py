@@ -0,0 +1,66 @@
+"""Contract Labour Request Models"""
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List
+
+
+class ContractorCreate(BaseModel):
+    """New contractor/agency"""
+    model_config = ConfigDict(extra="ignore")
+    name: str
+    company_name: Optional[str] = None
+    contact_person: Optional[str] = None
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    address: Optional[str] = None
+    gst_number: Optional[str] = None
+    pan_number: Optional[str] = None
+    department_id: Optional[str] = None
+    contract_start: Optional[str] = None
+    contract_end: Optional[str] = None
+    contract_value: Optional[float] = None
+
+
+class ContractWorkerCreate(BaseModel):
+    """New contract worker"""
+    model_config = ConfigDict(extra="ignore")
+    contractor_id: Optional[str] = None
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    aadhaar_number: Optional[str] = None
+    department_id: Optional[str] = None
+    location_id: Optional[str] = None
+    skill_category: Optional[str] = None
+    daily_rate: Optional[float] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    reporting_manager: Optional[str] = None
+
+
+class AttendanceCreate(BaseModel):
+    """Attendance mark for one contract worker; date defaults to today"""
+    model_config = ConfigDict(extra="ignore")
+    worker_id: str
+    contractor_id: Optional[str] = None
+    date: Optional[str] = None
+    status: str = "present"  # present, absent, half_day
+    in_time: Optional[str] = None
+    out_time: Optional[str] = None
+    hours_worked: Optional[float] = None
+    overtime_hours: float = 0
+    remarks: Optional[str] = None
+
+
+class AttendanceBulkCreate(BaseModel):
+    """Attendance marks for many workers at once"""
+    records: List[AttendanceCreate] = Field(min_length=1)
+
+
+class MonthlyRecordCreate(BaseModel):
+    """Monthly labour count and payment for a contractor"""
+    model_config = ConfigDict(extra="ignore")
+    contractor_id: str
+    month: str  # Format: YYYY-MM
+    labour_count: int = Field(gt=0)
+    payment_amount: float = Field(gt=0)
@@ -3,14 +3,15 @@ from fastapi import APIRouter, HTTPException, Request
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 router = APIRouter(prefix="/assets", tags=["Assets"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 
 async def get_current_user(request: Request) -> dict:
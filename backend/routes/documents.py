@@ -4,14 +4,15 @@ from typing import Optional
 from datetime import datetime, timezone
 import uuid
 import base64
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 router = APIRouter(tags=["Documents & Assets"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 
 async def get_current_user(request: Request) -> dict:
@@ -5,14 +5,15 @@ from typing import Optional
 from datetime import datetime, timezone
 import uuid
 import io
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 router = APIRouter(prefix="/events", tags=["Employee Events"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 
 async def get_current_user(request: Request) -> dict:
@@ -3,14 +3,15 @@ from fastapi import APIRouter, HTTPException, Request
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 router = APIRouter(prefix="/helpdesk", tags=["Helpdesk"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 
 async def get_current_user(request: Request) -> dict:
@@ -1353,20 +1354,26 @@ async def get_feedback_cycle_analytics(cycle_id: str, request: Request, employee
         assignments = cycle.get("assignments", [])
         target_ids = list(set(a.get("target_employee_id") for a in assignments))
         
+        # One pass over the feedbacks: per-target feedback count and [rating sum, rating count]
+        feedback_counts = {}
+        rating_totals = {}
+        for f in feedbacks:
+            tid = f.get("target_employee_id")
+            feedback_counts[tid] = feedback_counts.get(tid, 0) + 1
+            totals = rating_totals.setdefault(tid, [0, 0])
+            for a in f.get("answers", []):
+                if a.get("rating") is not None:
+                    totals[0] += a["rating"]
+                    totals[1] += 1
+        
         for tid in target_ids:
             emp = await db.employees.find_one(
                 {"$or": [{"employee_id": tid}, {"emp_code": tid}]},
                 {"_id": 0, "first_name": 1, "last_name": 1, "department": 1}
             )
-            emp_feedbacks = [f for f in feedbacks if f.get("target_employee_id") == tid]
             assigned = sum(1 for a in assignments if a.get("target_employee_id") == tid)
             completed = sum(1 for a in assignments if a.get("target_employee_id") == tid and a.get("status") == "completed")
-            
-            rating_scores = []
-            for f in emp_feedbacks:
-                for a in f.get("answers", []):
-                    if a.get("rating") is not None:
-                        rating_scores.append(a["rating"])
+            rating_sum, rating_count = rating_totals.get(tid, (0, 0))
             
             employee_summaries.append({
                 "employee_id": tid,
@@ -1374,8 +1381,8 @@ async def get_feedback_cycle_analytics(cycle_id: str, request: Request, employee
                 "department": emp.get("department", "") if emp else "",
                 "total_assigned": assigned,
                 "total_completed": completed,
-                "avg_score": round(sum(rating_scores) / len(rating_scores), 2) if rating_scores else None,
-                "total_feedbacks": len(emp_feedbacks)
+                "avg_score": round(rating_sum / rating_count, 2) if rating_count else None,
+                "total_feedbacks": feedback_counts.get(tid, 0)
             })
         
         employee_summaries.sort(key=lambda x: x.get("avg_score") or 0, reverse=True)
@@ -1413,49 +1420,76 @@ async def get_my_feedback_summary(request: Request):
     user = await get_current_user(request)
     emp_id = user.get("employee_id")
     
-    feedbacks = await db.feedback_responses.find({"target_employee_id": emp_id}, {"_id": 0}).to_list(200)
+    # Resolve each answer against its cycle's question and reduce server-side:
+    # one round trip returns the feedback count, per-category rating totals
+    # and the free-text answers
+    answer_stages = [
+        {"$unwind": "$cycle"},
+        {"$unwind": "$answers"},
+        {"$project": {
+            "_id": 0,
+            "answer": "$answers",
+            "question": {"$arrayElemAt": [
+                {"$filter": {
+                    "input": {"$ifNull": ["$cycle.questions", []]},
+                    "as": "q",
+                    "cond": {"$eq": ["$$q.question_id", "$answers.question_id"]}
+                }},
+                0
+            ]}
+        }},
+        {"$addFields": {"category": {"$ifNull": ["$question.category", "General"]}}},
+    ]
+    result = await db.feedback_responses.aggregate([
+        {"$match": {"target_employee_id": emp_id}},
+        {"$limit": 200},
+        {"$lookup": {"from": "feedback_cycles", "localField": "cycle_id", "foreignField": "cycle_id", "as": "cycle"}},
+        {"$facet": {
+            "feedbacks": [{"$count": "total"}],
+            "ratings": [
+                *answer_stages,
+                {"$match": {"answer.rating": {"$ne": None}}},
+                {"$group": {"_id": "$category", "sum": {"$sum": "$answer.rating"}, "count": {"$sum": 1}}}
+            ],
+            "text": [
+                *answer_stages,
+                {"$match": {
+                    "answer.rating": None,
+                    "answer.answer": {"$nin": [None, ""]},
+                    "question.type": {"$in": ["text", "long_text"]}
+                }},
+                {"$project": {"category": 1, "answer": "$answer.answer"}}
+            ]
+        }}
+    ]).to_list(1)
+    facets = result[0] if result else {}
     
-    if not feedbacks:
+    total_feedbacks = facets["feedbacks"][0]["total"] if facets.get("feedbacks") else 0
+    if not total_feedbacks:
         return {"has_feedback": False, "message": "No feedback received yet"}
     
-    # Aggregate scores by category
-    category_scores = {}
     text_feedback = {"strengths": [], "improvements": []}
-    
-    for f in feedbacks:
-        cycle = await db.feedback_cycles.find_one({"cycle_id": f["cycle_id"]}, {"_id": 0, "questions": 1, "anonymous": 1})
-        if not cycle:
-            continue
-        q_map = {q["question_id"]: q for q in cycle.get("questions", [])}
-        
-        for a in f.get("answers", []):
-            q = q_map.get(a.get("question_id"), {})
-            cat = q.get("category", "General")
-            
-            if a.get("rating") is not None:
-                if cat not in category_scores:
-                    category_scores[cat] = []
-                category_scores[cat].append(a["rating"])
-            elif a.get("answer") and q.get("type") in ["text", "long_text"]:
-                if "strength" in cat.lower():
-                    text_feedback["strengths"].append(a["answer"])
-                elif "improve" in cat.lower():
-                    text_feedback["improvements"].append(a["answer"])
+    for t in facets.get("text", []):
+        cat = t["category"].lower()
+        if "strength" in cat:
+            text_feedback["strengths"].append(t["answer"])
+        elif "improve" in cat:
+            text_feedback["improvements"].append(t["answer"])
     
     categories = []
-    for cat, scores in category_scores.items():
+    overall = total = 0
+    for row in facets.get("ratings", []):
         categories.append({
-            "category": cat,
-            "average": round(sum(scores) / len(scores), 2),
-            "count": len(scores)
+            "category": row["_id"],
+            "average": round(row["sum"] / row["count"], 2),
+            "count": row["count"]
         })
-    
-    overall = sum(s for scores in category_scores.values() for s in scores)
-    total = sum(len(scores) for scores in category_scores.values())
+        overall += row["sum"]
+        total += row["count"]
     
     return {
         "has_feedback": True,
-        "total_feedbacks": len(feedbacks),
+        "total_feedbacks": total_feedbacks,
         "overall_score": round(overall / total, 2) if total else None,
         "categories": sorted(categories, key=lambda x: x["average"], reverse=True),
         "text_feedback": text_feedback
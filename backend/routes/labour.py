@@ -1,35 +1,235 @@
 """Labour & Contract Labour Management API Routes"""
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from typing import List, Optional
 from datetime import datetime, timezone
-import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+import asyncio
+import functools
+import hashlib
+import orjson
+import secrets
+import time
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from models.labour import (
+    AttendanceBulkCreate, AttendanceCreate, ContractWorkerCreate, ContractorCreate, MonthlyRecordCreate
+)
+from services.cache import TTLCache
+from services.indexes import ensure_index, ensure_unique_index
+
+# Handlers that return raw Mongo documents (JSON-native types only, no _id)
+# wrap them in ORJSONResponse themselves, skipping jsonable_encoder's walk
+router = APIRouter(prefix="/labour", tags=["Labour Management"], default_response_class=ORJSONResponse)
+
+# Shares the server's client and connection pool - set up when router is included
+db = None
+# Worker document files; worker_documents keeps only their metadata
+documents_bucket = None
+
+def set_db(database):
+    global db, documents_bucket
+    db = database
+    documents_bucket = AsyncIOMotorGridFSBucket(database, bucket_name="worker_docs")
+
+# Role whitelists for the labour endpoints
+ROLES_ADMIN = frozenset({"super_admin", "hr_admin"})
+ROLES_HR = frozenset({"super_admin", "hr_admin", "hr_executive"})
+ROLES_READ = frozenset({"super_admin", "hr_admin", "hr_executive", "manager"})
+
+# Dashboard summary is polled constantly; cache it briefly and clear it
+# from every write that changes the counts. Once expired, the old value is
+# served for a while longer while a single request recomputes it. Entries are
+# encoded JSON bodies; bump the version suffix when the payload shape changes
+SUMMARY_CACHE_KEY = "labour:summary:v1"
+summary_cache = TTLCache(ttl=60, stale_ttl=120)
+
+# Encoded JSON bodies of list responses, keyed by path + query params; the
+# matching create/update handlers drop the whole prefix. The cache lives in
+# each worker process, so a write only clears the copy of the worker that
+# handled it - the short TTL bounds how long other workers serve old lists
+CONTRACTORS_CACHE_PREFIX = "labour:contractors"
+WORKERS_CACHE_PREFIX = "labour:workers"
+ATTENDANCE_CACHE_PREFIX = "labour:attendance"
+list_cache = TTLCache(ttl=30)
+
+# Table columns for ?summary=true list views; full documents stay available
+# from the default listing and from /contractors/{id} and /workers/{id}
+CONTRACTOR_SUMMARY_FIELDS = {
+    "_id": 0, "contractor_id": 1, "name": 1, "company_name": 1, "contact_person": 1,
+    "phone": 1, "department_id": 1, "contract_start": 1, "contract_end": 1,
+    "status": 1, "worker_count": 1
+}
+WORKER_SUMMARY_FIELDS = {
+    "_id": 0, "worker_id": 1, "name": 1, "first_name": 1, "last_name": 1, "phone": 1,
+    "contractor_id": 1, "department_id": 1, "daily_rate": 1, "daily_wage": 1,
+    "start_date": 1, "joining_date": 1, "status": 1
+}
 
-router = APIRouter(prefix="/labour", tags=["Labour Management"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+async def get_current_user(request: Request) -> dict:
+    """Resolve the session user once per request and reuse it from request.state"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        from server import get_current_user as auth_get_user
+        user = request.state.user = await auth_get_user(request)
+    return user
+
+
+@functools.lru_cache(maxsize=None)
+def require_roles(roles: frozenset):
+    """Dependency returning the current user, or 403 if their role is not in `roles`.
+    Cached per role set, so every route guarded by the same set shares one
+    dependency callable and FastAPI resolves it at most once per request."""
+    async def dependency(request: Request) -> dict:
+        user = await get_current_user(request)
+        if user.get("role") not in roles:
+            raise HTTPException(status_code=403, detail="Not authorized")
+        return user
+    return dependency
+
+
+def generate_id(prefix: str) -> str:
+    """Time-ordered business id: millisecond timestamp followed by 24 random bits.
+    New ids sort after existing ones, so inserts append to the right-hand edge of
+    the unique index instead of landing on random pages."""
+    return f"{prefix}-{time.time_ns() // 1_000_000:011X}{secrets.token_hex(3).upper()}"
+
+
+async def load_worker_count(contractor: dict):
+    """Fill in the active worker count of a contractor created before the
+    stored counter existed, and persist it so this only happens once"""
+    if "worker_count" in contractor:
+        return
+    contractor["worker_count"] = await db.contract_workers.count_documents(
+        {"contractor_id": contractor["contractor_id"], "is_active": True}
+    )
+    await db.contractors.update_one(
+        {"contractor_id": contractor["contractor_id"], "worker_count": {"$exists": False}},
+        {"$set": {"worker_count": contractor["worker_count"]}}
+    )
 
 
-async def get_current_user(request: Request) -> dict:
-    from server import get_current_user as auth_get_user
-    return await auth_get_user(request)
+async def adjust_worker_count(contractor_id: str, delta: int):
+    """Keep the denormalized active worker count on the contractor in step.
+    Legacy contractors without the field are left for get_contractor to backfill."""
+    await db.contractors.update_one(
+        {"contractor_id": contractor_id, "worker_count": {"$exists": True}},
+        {"$inc": {"worker_count": delta}}
+    )
+    list_cache.clear(CONTRACTORS_CACHE_PREFIX)
+
+
+async def ensure_indexes():
+    """Create indexes backing the labour list filters, sorts and summary counts.
+    Equality keys come first and the sort key last, so sorted listings are
+    served in index order. Each index is built independently, so one failure
+    is logged without skipping the rest."""
+    await ensure_index(db.contractors, "contractor_id", unique=True)
+    await ensure_index(db.contractors, [("is_active", 1), ("status", 1), ("department_id", 1)])
+    await ensure_index(db.contract_workers, "worker_id", unique=True)
+    await ensure_index(
+        db.contract_workers,
+        [("is_active", 1), ("contractor_id", 1), ("department_id", 1), ("status", 1)]
+    )
+    await ensure_index(db.contract_worker_attendance, "attendance_id", unique=True)
+    # One attendance entry per worker per day. Older clients re-posted marks;
+    # while legacy duplicates remain the build is skipped and logged, and
+    # dedupe_contract_attendance.py removes them
+    await ensure_unique_index(db.contract_worker_attendance, [("worker_id", 1), ("date", -1)])
+    await ensure_index(db.contract_worker_attendance, [("contractor_id", 1), ("date", -1)])
+    await ensure_index(db.contract_worker_attendance, [("date", 1), ("status", 1)])
+    await ensure_index(db.contractor_monthly_records, "record_id", unique=True)
+    await ensure_index(db.contractor_monthly_records, [("contractor_id", 1), ("month", -1)], unique=True)
+    await ensure_index(db.contractor_monthly_records, [("month", -1)])
+    await ensure_index(db.worker_documents, [("worker_id", 1), ("document_type", 1)], unique=True)
+
+
+def cached_json_response(cache_key: str) -> Optional[Response]:
+    """Return the cached JSON body for a list endpoint, if still fresh"""
+    body = list_cache.get(cache_key)
+    if body is None:
+        return None
+    return Response(content=body, media_type="application/json")
+
+
+def stream_json_list(cursor, cache_key: str, flush_size: int = 64 * 1024) -> StreamingResponse:
+    """Stream a cursor as a JSON array without materializing the documents.
+    
+    Encoded chunks are flushed roughly every `flush_size` bytes and the full
+    body is cached under `cache_key` once the cursor is exhausted, unless a
+    write cleared the cache while it was streaming.
+    """
+    async def body():
+        generation = list_cache.generation
+        chunks = []
+        buf = bytearray(b"[")
+        first = True
+        async for doc in cursor:
+            if not first:
+                buf += b","
+            buf += orjson.dumps(doc)
+            first = False
+            if len(buf) >= flush_size:
+                chunk = bytes(buf)
+                chunks.append(chunk)
+                buf.clear()
+                yield chunk
+        buf += b"]"
+        chunk = bytes(buf)
+        chunks.append(chunk)
+        yield chunk
+        if list_cache.generation == generation:
+            list_cache.set(cache_key, b"".join(chunks))
+    
+    return StreamingResponse(body(), media_type="application/json")
+
+
+async def keyset_page(collection, query: dict, projection: dict, keys: List[str],
+                      limit: int, cursor: Optional[str]) -> ORJSONResponse:
+    """One page of `collection` sorted descending on `keys`, resuming after `cursor`.
+    
+    The cursor is the previous page's last row's key values joined with "|",
+    so each page is an index range scan instead of an ever-growing skip.
+    """
+    limit = max(1, min(limit, 500))
+    query = dict(query)
+    if cursor:
+        values = cursor.split("|")
+        if len(values) != len(keys):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        # (k1 < v1) or (k1 == v1 and k2 < v2) ...
+        query["$or"] = [
+            {**dict(zip(keys[:i], values[:i])), key: {"$lt": values[i]}}
+            for i, key in enumerate(keys)
+        ]
+    
+    items = await collection.find(query, projection).sort([(key, -1) for key in keys]).to_list(limit)
+    next_cursor = None
+    if len(items) == limit:
+        next_cursor = "|".join(str(items[-1].get(key, "")) for key in keys)
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
 
 
 # ==================== CONTRACTORS ====================
 
 @router.get("/contractors")
 async def list_contractors(
-    request: Request,
     status: Optional[str] = None,
-    department_id: Optional[str] = None
+    department_id: Optional[str] = None,
+    summary: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user: dict = Depends(require_roles(ROLES_HR))
 ):
-    """List contractors/agencies"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    """List contractors/agencies (summary=true returns only the table columns).
+    Passing limit switches to pages of {"items", "next_cursor"}."""
+    cache_key = f"{CONTRACTORS_CACHE_PREFIX}:{status}:{department_id}:{summary}"
+    cached = cached_json_response(cache_key) if limit is None else None
+    if cached is not None:
+        return cached
     
     query = {"is_active": True}
     if status:
@@ -37,86 +237,113 @@ async def list_contractors(
     if department_id:
         query["department_id"] = department_id
     
-    contractors = await db.contractors.find(query, {"_id": 0}).to_list(100)
-    return contractors
+    projection = CONTRACTOR_SUMMARY_FIELDS if summary else {"_id": 0}
+    if limit is not None:
+        return await keyset_page(db.contractors, query, projection, ["contractor_id"], limit, cursor)
+    return stream_json_list(db.contractors.find(query, projection).limit(100), cache_key)
 
 
 @router.post("/contractors")
-async def create_contractor(data: dict, request: Request):
+async def create_contractor(
+    data: ContractorCreate,
+    user: dict = Depends(require_roles(ROLES_ADMIN))
+):
     """Register contractor/agency"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     contractor = {
-        "contractor_id": f"CONT-{uuid.uuid4().hex[:8].upper()}",
-        "name": data.get("name"),
-        "company_name": data.get("company_name"),
-        "contact_person": data.get("contact_person"),
-        "email": data.get("email"),
-        "phone": data.get("phone"),
-        "address": data.get("address"),
-        "gst_number": data.get("gst_number"),
-        "pan_number": data.get("pan_number"),
-        "department_id": data.get("department_id"),
-        "contract_start": data.get("contract_start"),
-        "contract_end": data.get("contract_end"),
-        "contract_value": data.get("contract_value"),
+        "contractor_id": generate_id("CONT"),
+        **data.model_dump(),
+        "worker_count": 0,
         "status": "active",
         "is_active": True,
         "created_by": user["user_id"],
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.contractors.insert_one(contractor)
-    contractor.pop('_id', None)
+    # Insert a copy so the driver's generated _id never lands in the response
+    await db.contractors.insert_one({**contractor})
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(CONTRACTORS_CACHE_PREFIX)
     return contractor
 
 
 @router.get("/contractors/{contractor_id}")
-async def get_contractor(contractor_id: str, request: Request):
-    """Get contractor details"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    contractor = await db.contractors.find_one({"contractor_id": contractor_id}, {"_id": 0})
-    if not contractor:
+async def get_contractor(
+    contractor_id: str,
+    include_workers: bool = True,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
+    """Get contractor details with its worker list; include_workers=false
+    skips the workers and returns only the stored worker_count"""
+    if not include_workers:
+        contractor = await db.contractors.find_one({"contractor_id": contractor_id}, {"_id": 0})
+        if not contractor:
+            raise HTTPException(status_code=404, detail="Contractor not found")
+        await load_worker_count(contractor)
+        return ORJSONResponse(contractor)
+    
+    # Contractor and its workers (terminated ones included, first 200) in one
+    # round trip; worker_count stays the stored count of active workers
+    result = await db.contractors.aggregate([
+        {"$match": {"contractor_id": contractor_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "contract_workers",
+            "let": {"cid": "$contractor_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$contractor_id", "$$cid"]}}},
+                {"$limit": 200},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "workers"
+        }},
+        {"$project": {"_id": 0}}
+    ]).to_list(1)
+    if not result:
         raise HTTPException(status_code=404, detail="Contractor not found")
     
-    # Get associated workers
-    workers = await db.contract_workers.find({"contractor_id": contractor_id}, {"_id": 0}).to_list(200)
-    contractor["workers"] = workers
-    contractor["worker_count"] = len(workers)
-    
-    return contractor
+    await load_worker_count(result[0])
+    return ORJSONResponse(result[0])
 
 
 @router.put("/contractors/{contractor_id}")
-async def update_contractor(contractor_id: str, data: dict, request: Request):
+async def update_contractor(
+    contractor_id: str,
+    data: dict,
+    user: dict = Depends(require_roles(ROLES_ADMIN))
+):
     """Update contractor"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.contractors.update_one({"contractor_id": contractor_id}, {"$set": data})
-    return await db.contractors.find_one({"contractor_id": contractor_id}, {"_id": 0})
+    updated = await db.contractors.find_one_and_update(
+        {"contractor_id": contractor_id},
+        {"$set": data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Contractor not found")
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(CONTRACTORS_CACHE_PREFIX)
+    return ORJSONResponse(updated)
 
 
 # ==================== CONTRACT WORKERS ====================
 
 @router.get("/workers")
 async def list_contract_workers(
-    request: Request,
     contractor_id: Optional[str] = None,
     status: Optional[str] = None,
-    department_id: Optional[str] = None
+    department_id: Optional[str] = None,
+    summary: bool = False,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user: dict = Depends(require_roles(ROLES_READ))
 ):
-    """List contract workers"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    """List contract workers (summary=true returns only the table columns).
+    Passing limit switches to pages of {"items", "next_cursor"}."""
+    cache_key = f"{WORKERS_CACHE_PREFIX}:{contractor_id}:{status}:{department_id}:{summary}"
+    cached = cached_json_response(cache_key) if limit is None else None
+    if cached is not None:
+        return cached
     
     query = {"is_active": True}
     if contractor_id:
@@ -126,93 +353,126 @@ async def list_contract_workers(
     if department_id:
         query["department_id"] = department_id
     
-    workers = await db.contract_workers.find(query, {"_id": 0}).to_list(500)
-    return workers
+    projection = WORKER_SUMMARY_FIELDS if summary else {"_id": 0}
+    if limit is not None:
+        return await keyset_page(db.contract_workers, query, projection, ["worker_id"], limit, cursor)
+    return stream_json_list(db.contract_workers.find(query, projection).limit(500), cache_key)
 
 
 @router.post("/workers")
-async def create_contract_worker(data: dict, request: Request):
+async def create_contract_worker(
+    data: ContractWorkerCreate,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Add contract worker"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     worker = {
-        "worker_id": f"CW-{uuid.uuid4().hex[:8].upper()}",
-        "contractor_id": data.get("contractor_id"),
-        "first_name": data.get("first_name"),
-        "last_name": data.get("last_name"),
-        "phone": data.get("phone"),
-        "email": data.get("email"),
-        "aadhaar_number": data.get("aadhaar_number"),
-        "department_id": data.get("department_id"),
-        "location_id": data.get("location_id"),
-        "skill_category": data.get("skill_category"),
-        "daily_rate": data.get("daily_rate"),
-        "start_date": data.get("start_date"),
-        "end_date": data.get("end_date"),
-        "reporting_manager": data.get("reporting_manager"),
+        "worker_id": generate_id("CW"),
+        **data.model_dump(),
         "status": "active",
         "is_active": True,
         "created_by": user["user_id"],
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.contract_workers.insert_one(worker)
-    worker.pop('_id', None)
+    # Insert a copy so the driver's generated _id never lands in the response
+    await db.contract_workers.insert_one({**worker})
+    if worker["contractor_id"]:
+        await adjust_worker_count(worker["contractor_id"], 1)
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(WORKERS_CACHE_PREFIX)
     return worker
 
 
 @router.get("/workers/{worker_id}")
-async def get_contract_worker(worker_id: str, request: Request):
+async def get_contract_worker(
+    worker_id: str,
+    user: dict = Depends(require_roles(ROLES_READ))
+):
     """Get contract worker details"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    worker = await db.contract_workers.find_one({"worker_id": worker_id}, {"_id": 0})
-    if not worker:
+    # Worker and latest 30 attendance entries in one round trip
+    result = await db.contract_workers.aggregate([
+        {"$match": {"worker_id": worker_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "contract_worker_attendance",
+            "let": {"wid": "$worker_id"},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$worker_id", "$$wid"]}}},
+                {"$sort": {"date": -1}},
+                {"$limit": 30},
+                {"$project": {"_id": 0}}
+            ],
+            "as": "recent_attendance"
+        }},
+        {"$project": {"_id": 0}}
+    ]).to_list(1)
+    if not result:
         raise HTTPException(status_code=404, detail="Worker not found")
     
-    # Get attendance
-    attendance = await db.contract_worker_attendance.find(
-        {"worker_id": worker_id}, {"_id": 0}
-    ).sort("date", -1).to_list(30)
-    worker["recent_attendance"] = attendance
-    
-    return worker
+    return ORJSONResponse(result[0])
 
 
 @router.put("/workers/{worker_id}")
-async def update_contract_worker(worker_id: str, data: dict, request: Request):
+async def update_contract_worker(
+    worker_id: str,
+    data: dict,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Update contract worker"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     data["updated_at"] = datetime.now(timezone.utc).isoformat()
-    await db.contract_workers.update_one({"worker_id": worker_id}, {"$set": data})
-    return await db.contract_workers.find_one({"worker_id": worker_id}, {"_id": 0})
+    # Moving a worker or changing is_active shifts the contractors' active
+    # counts; read the previous values atomically with the write for that.
+    # Update bodies are flat field maps, so the new document is old + data
+    recount = "contractor_id" in data or "is_active" in data
+    updated = await db.contract_workers.find_one_and_update(
+        {"worker_id": worker_id},
+        {"$set": data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.BEFORE if recount else ReturnDocument.AFTER
+    )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    if recount:
+        previous, updated = updated, {**updated, **data}
+        old_contractor = previous.get("contractor_id") if previous.get("is_active") else None
+        new_contractor = updated.get("contractor_id") if updated.get("is_active") else None
+        if old_contractor != new_contractor:
+            if old_contractor:
+                await adjust_worker_count(old_contractor, -1)
+            if new_contractor:
+                await adjust_worker_count(new_contractor, 1)
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(WORKERS_CACHE_PREFIX)
+    return ORJSONResponse(updated)
 
 
 @router.put("/workers/{worker_id}/terminate")
-async def terminate_contract_worker(worker_id: str, data: dict, request: Request):
+async def terminate_contract_worker(
+    worker_id: str,
+    data: dict,
+    user: dict = Depends(require_roles(ROLES_ADMIN))
+):
     """Terminate contract worker"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    await db.contract_workers.update_one(
+    now = datetime.now(timezone.utc)
+    previous = await db.contract_workers.find_one_and_update(
         {"worker_id": worker_id},
         {"$set": {
             "status": "terminated",
             "is_active": False,
-            "termination_date": data.get("termination_date", datetime.now(timezone.utc).date().isoformat()),
+            "termination_date": data.get("termination_date") or now.date().isoformat(),
             "termination_reason": data.get("reason"),
             "terminated_by": user["user_id"],
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+            "updated_at": now.isoformat()
+        }},
+        projection={"_id": 0, "contractor_id": 1, "is_active": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    if not previous:
+        raise HTTPException(status_code=404, detail="Worker not found")
+    if previous.get("is_active") and previous.get("contractor_id"):
+        await adjust_worker_count(previous["contractor_id"], -1)
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(WORKERS_CACHE_PREFIX)
     return {"message": "Worker terminated"}
 
 
@@ -220,15 +480,21 @@ async def terminate_contract_worker(worker_id: str, data: dict, request: Request
 
 @router.get("/attendance")
 async def list_contract_worker_attendance(
-    request: Request,
     worker_id: Optional[str] = None,
     contractor_id: Optional[str] = None,
-    date: Optional[str] = None
+    date: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user: dict = Depends(require_roles(ROLES_READ))
 ):
-    """List contract worker attendance"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    """List contract worker attendance (start/end give an inclusive YYYY-MM-DD range).
+    Passing limit switches to pages of {"items", "next_cursor"}, newest first."""
+    cache_key = f"{ATTENDANCE_CACHE_PREFIX}:{worker_id}:{contractor_id}:{date}:{start}:{end}"
+    cached = cached_json_response(cache_key) if limit is None else None
+    if cached is not None:
+        return cached
     
     query = {}
     if worker_id:
@@ -237,163 +503,220 @@ async def list_contract_worker_attendance(
         query["contractor_id"] = contractor_id
     if date:
         query["date"] = date
-    
-    attendance = await db.contract_worker_attendance.find(query, {"_id": 0}).sort("date", -1).to_list(500)
-    return attendance
+    elif start or end:
+        # YYYY-MM-DD strings sort chronologically, so the date index serves the range
+        date_range = {}
+        for op, value in (("$gte", start), ("$lte", end)):
+            if value:
+                try:
+                    date_range[op] = datetime.fromisoformat(value).date().isoformat()
+                except ValueError:
+                    raise HTTPException(status_code=400, detail="start/end must be YYYY-MM-DD dates")
+        query["date"] = date_range
+    
+    if limit is not None:
+        return await keyset_page(
+            db.contract_worker_attendance, query, {"_id": 0}, ["date", "attendance_id"], limit, cursor
+        )
+    docs = db.contract_worker_attendance.find(query, {"_id": 0}).sort("date", -1).limit(500)
+    return stream_json_list(docs, cache_key)
+
+
+def build_attendance_record(data: AttendanceCreate, user: dict, now: datetime) -> dict:
+    """Build a contract worker attendance document from request data.
+    `now` is taken once per request so bulk marking shares one timestamp."""
+    return {
+        "attendance_id": f"cwa_{secrets.token_hex(6)}",
+        **data.model_dump(),
+        "date": data.date or now.date().isoformat(),
+        "marked_by": user["user_id"],
+        "created_at": now.isoformat()
+    }
 
 
 @router.post("/attendance")
-async def mark_contract_worker_attendance(data: dict, request: Request):
-    """Mark contract worker attendance"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    attendance = {
-        "attendance_id": f"cwa_{uuid.uuid4().hex[:12]}",
-        "worker_id": data.get("worker_id"),
-        "contractor_id": data.get("contractor_id"),
-        "date": data.get("date", datetime.now(timezone.utc).date().isoformat()),
-        "status": data.get("status", "present"),  # present, absent, half_day
-        "in_time": data.get("in_time"),
-        "out_time": data.get("out_time"),
-        "hours_worked": data.get("hours_worked"),
-        "overtime_hours": data.get("overtime_hours", 0),
-        "remarks": data.get("remarks"),
-        "marked_by": user["user_id"],
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    
-    await db.contract_worker_attendance.insert_one(attendance)
-    attendance.pop('_id', None)
+async def mark_contract_worker_attendance(
+    data: AttendanceCreate,
+    user: dict = Depends(require_roles(ROLES_READ))
+):
+    """Mark contract worker attendance.
+    
+    Upserts on (worker_id, date): marking a worker again for a date that
+    already has an entry overwrites the fields sent (status, times, ...) and
+    marked_by. Fields left out of the request keep their stored values, and
+    attendance_id and created_at are kept. The stored entry is returned.
+    """
+    attendance = build_attendance_record(data, user, datetime.now(timezone.utc))
+    created = {k: attendance.pop(k) for k in ("attendance_id", "created_at")}
+    # Defaults for fields the request left out only apply to a new entry
+    for field in AttendanceCreate.model_fields.keys() - data.model_fields_set - {"date"}:
+        created[field] = attendance.pop(field)
+    
+    attendance = await db.contract_worker_attendance.find_one_and_update(
+        {"worker_id": attendance["worker_id"], "date": attendance["date"]},
+        {"$set": attendance, "$setOnInsert": created},
+        projection={"_id": 0},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(ATTENDANCE_CACHE_PREFIX)
     return attendance
 
 
+@router.post("/attendance/bulk")
+async def bulk_mark_contract_worker_attendance(
+    data: AttendanceBulkCreate,
+    user: dict = Depends(require_roles(ROLES_READ))
+):
+    """Mark attendance for many contract workers in one call (e.g. a whole shift).
+    Workers already marked for the date are skipped and counted as duplicates."""
+    now = datetime.now(timezone.utc)
+    attendance = [build_attendance_record(r, user, now) for r in data.records]
+    
+    try:
+        result = await db.contract_worker_attendance.insert_many(attendance, ordered=False)
+        inserted, duplicates = len(result.inserted_ids), 0
+    except BulkWriteError as e:
+        # ordered=False keeps inserting past duplicates; anything else is a real failure
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        inserted, duplicates = e.details.get("nInserted", 0), len(errors)
+    
+    summary_cache.clear(SUMMARY_CACHE_KEY)
+    list_cache.clear(ATTENDANCE_CACHE_PREFIX)
+    return {"inserted": inserted, "duplicates": duplicates}
+
+
 # ==================== SUMMARY & REPORTS ====================
 
 @router.get("/summary")
-async def get_labour_summary(request: Request):
+async def get_labour_summary(
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Get labour management summary"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
+    body = await summary_cache.get_or_set(SUMMARY_CACHE_KEY, compute_labour_summary)
+    return Response(content=body, media_type="application/json")
+
+
+async def compute_labour_summary() -> bytes:
+    """Run the summary counts and encode them; called by the cache on a miss"""
     today = datetime.now(timezone.utc).date().isoformat()
     
-    total_contractors = await db.contractors.count_documents({"is_active": True})
-    total_workers = await db.contract_workers.count_documents({"is_active": True})
-    
-    # Workers by department
-    by_department = await db.contract_workers.aggregate([
-        {"$match": {"is_active": True}},
-        {"$group": {"_id": "$department_id", "count": {"$sum": 1}}}
-    ]).to_list(20)
+    # Independent queries run concurrently; active-worker count and the
+    # per-department breakdown come from a single $facet pass
+    total_contractors, worker_stats, present_today = await asyncio.gather(
+        db.contractors.count_documents({"is_active": True}),
+        db.contract_workers.aggregate([
+            {"$match": {"is_active": True}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "by_department": [
+                    {"$group": {"_id": "$department_id", "count": {"$sum": 1}}},
+                    {"$limit": 20}
+                ]
+            }}
+        ]).to_list(1),
+        # Today's attendance
+        db.contract_worker_attendance.count_documents({
+            "date": today, "status": "present"
+        })
+    )
     
-    # Today's attendance
-    present_today = await db.contract_worker_attendance.count_documents({
-        "date": today, "status": "present"
-    })
+    facets = worker_stats[0] if worker_stats else {}
+    total_workers = facets["total"][0]["count"] if facets.get("total") else 0
+    by_department = facets.get("by_department", [])
     
-    return {
+    return orjson.dumps({
         "total_contractors": total_contractors,
         "total_workers": total_workers,
         "present_today": present_today,
         "by_department": by_department
-    }
+    })
 
 
 # ==================== MONTHLY LABOUR RECORDS ====================
 
 @router.get("/monthly-records")
 async def list_monthly_records(
-    request: Request,
-    contractor_id: Optional[str] = None
+    contractor_id: Optional[str] = None,
+    user: dict = Depends(require_roles(ROLES_HR))
 ):
     """List monthly labour records for a contractor"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     query = {}
     if contractor_id:
         query["contractor_id"] = contractor_id
     
     records = await db.contractor_monthly_records.find(query, {"_id": 0}).sort("month", -1).to_list(100)
-    return records
+    return ORJSONResponse(records)
 
 
 @router.post("/monthly-records")
-async def create_monthly_record(data: dict, request: Request):
+async def create_monthly_record(
+    data: MonthlyRecordCreate,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Create monthly labour record"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    contractor_id = data.get("contractor_id")
-    month = data.get("month")  # Format: YYYY-MM
-    labour_count = data.get("labour_count")
-    payment_amount = data.get("payment_amount")
-    
-    if not contractor_id or not month or not labour_count or not payment_amount:
-        raise HTTPException(status_code=400, detail="Missing required fields")
-    
-    # Check if record already exists for this month
-    existing = await db.contractor_monthly_records.find_one({
-        "contractor_id": contractor_id,
-        "month": month
-    })
+    duplicate_detail = f"Record for {data.month} already exists. Please edit the existing record."
     
+    # Checked here as well as by the unique (contractor_id, month) index, in
+    # case that index could not be built at startup
+    existing = await db.contractor_monthly_records.find_one(
+        {"contractor_id": data.contractor_id, "month": data.month}, {"_id": 1}
+    )
     if existing:
-        raise HTTPException(status_code=400, detail=f"Record for {month} already exists. Please edit the existing record.")
+        raise HTTPException(status_code=400, detail=duplicate_detail)
     
     record = {
-        "record_id": f"CMR-{uuid.uuid4().hex[:8].upper()}",
-        "contractor_id": contractor_id,
-        "month": month,
-        "labour_count": int(labour_count),
-        "payment_amount": float(payment_amount),
+        "record_id": generate_id("CMR"),
+        **data.model_dump(),
         "created_by": user["user_id"],
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.contractor_monthly_records.insert_one(record)
-    record.pop('_id', None)
+    # The unique index also catches a concurrent create for the same month
+    try:
+        await db.contractor_monthly_records.insert_one({**record})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=duplicate_detail)
     return record
 
 
 @router.put("/monthly-records/{record_id}")
-async def update_monthly_record(record_id: str, data: dict, request: Request):
+async def update_monthly_record(
+    record_id: str,
+    data: dict,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Update monthly labour record"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    existing = await db.contractor_monthly_records.find_one({"record_id": record_id})
-    if not existing:
-        raise HTTPException(status_code=404, detail="Record not found")
-    
+    # Only the fields sent are changed, so no read of the current values is needed
     update_data = {
-        "labour_count": int(data.get("labour_count", existing.get("labour_count", 0))),
-        "payment_amount": float(data.get("payment_amount", existing.get("payment_amount", 0))),
         "updated_by": user["user_id"],
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
+    if "labour_count" in data:
+        update_data["labour_count"] = int(data["labour_count"])
+    if "payment_amount" in data:
+        update_data["payment_amount"] = float(data["payment_amount"])
     
-    await db.contractor_monthly_records.update_one(
+    updated = await db.contractor_monthly_records.find_one_and_update(
         {"record_id": record_id},
-        {"$set": update_data}
+        {"$set": update_data},
+        projection={"_id": 0, "record_id": 1}
     )
+    if not updated:
+        raise HTTPException(status_code=404, detail="Record not found")
     
     return {"message": "Record updated"}
 
 
 @router.delete("/monthly-records/{record_id}")
-async def delete_monthly_record(record_id: str, request: Request):
+async def delete_monthly_record(
+    record_id: str,
+    user: dict = Depends(require_roles(ROLES_ADMIN))
+):
     """Delete monthly labour record"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
     result = await db.contractor_monthly_records.delete_one({"record_id": record_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Record not found")
@@ -404,52 +727,65 @@ async def delete_monthly_record(record_id: str, request: Request):
 # ==================== WORKER DOCUMENTS ====================
 
 @router.get("/workers/{worker_id}/documents")
-async def list_worker_documents(worker_id: str, request: Request):
+async def list_worker_documents(
+    worker_id: str,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """List documents for a contract worker"""
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
+    # Metadata only - inline file_data from pre-GridFS uploads is never listed
     documents = await db.worker_documents.find(
         {"worker_id": worker_id},
-        {"_id": 0}
+        {"_id": 0, "file_data": 0}
     ).to_list(50)
-    return documents
+    return ORJSONResponse(documents)
 
 
 @router.post("/workers/{worker_id}/documents")
-async def upload_worker_document(worker_id: str, request: Request):
+async def upload_worker_document(
+    worker_id: str,
+    request: Request,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Upload a document for a contract worker"""
-    from fastapi import UploadFile
-    import base64
-    
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    # Check worker exists
-    worker = await db.contract_workers.find_one({"worker_id": worker_id})
+    # Worker existence check overlaps with reading the multipart body
+    worker, form = await asyncio.gather(
+        db.contract_workers.find_one({"worker_id": worker_id}, {"_id": 1}),
+        request.form()
+    )
     if not worker:
         raise HTTPException(status_code=404, detail="Worker not found")
     
-    # Parse multipart form data
-    form = await request.form()
     document_type = form.get("document_type")
     file = form.get("file")
     
     if not document_type or not file:
         raise HTTPException(status_code=400, detail="Document type and file are required")
     
-    # Read file content and encode as base64
     file_content = await file.read()
-    file_base64 = base64.b64encode(file_content).decode('utf-8')
+    digest = hashlib.sha256(file_content).hexdigest()
+    
+    # Re-uploading identical content leaves the stored file and metadata alone
+    existing = await db.worker_documents.find_one(
+        {"worker_id": worker_id, "document_type": document_type},
+        {"_id": 0, "document_id": 1, "sha256": 1}
+    )
+    if existing and existing.get("sha256") == digest:
+        return {"message": "Document uploaded", "document_id": existing["document_id"]}
+    
+    # File bytes go to GridFS as-is; the metadata document only references them
+    file_id = await documents_bucket.upload_from_stream(
+        file.filename or "document",
+        file_content,
+        metadata={"worker_id": worker_id, "document_type": document_type, "content_type": file.content_type}
+    )
     
     doc = {
-        "document_id": f"doc_{uuid.uuid4().hex[:12]}",
+        "document_id": f"doc_{secrets.token_hex(6)}",
         "worker_id": worker_id,
         "document_type": document_type,
         "file_name": file.filename,
-        "file_data": file_base64,
+        "file_id": str(file_id),
+        "sha256": digest,
         "file_url": f"/api/labour/workers/{worker_id}/documents/{document_type}",
         "content_type": file.content_type,
         "uploaded_by": user["user_id"],
@@ -457,40 +793,61 @@ async def upload_worker_document(worker_id: str, request: Request):
     }
     
     # Upsert - replace if same document type exists
-    await db.worker_documents.update_one(
+    previous = await db.worker_documents.find_one_and_update(
         {"worker_id": worker_id, "document_type": document_type},
-        {"$set": doc},
+        {"$set": doc, "$unset": {"file_data": ""}},
+        projection={"_id": 0, "file_id": 1},
         upsert=True
     )
+    if previous and previous.get("file_id"):
+        await documents_bucket.delete(ObjectId(previous["file_id"]))
     
     return {"message": "Document uploaded", "document_id": doc["document_id"]}
 
 
 @router.get("/workers/{worker_id}/documents/{document_type}")
-async def download_worker_document(worker_id: str, document_type: str, request: Request):
+async def download_worker_document(
+    worker_id: str,
+    document_type: str,
+    user: dict = Depends(require_roles(ROLES_HR))
+):
     """Download a specific document"""
-    from fastapi.responses import Response
     import base64
     
-    user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
-        raise HTTPException(status_code=403, detail="Not authorized")
-    
-    doc = await db.worker_documents.find_one({
-        "worker_id": worker_id,
-        "document_type": document_type
-    })
+    doc = await db.worker_documents.find_one(
+        {"worker_id": worker_id, "document_type": document_type},
+        {"_id": 0, "file_id": 1, "file_data": 1, "file_name": 1, "content_type": 1}
+    )
     
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    file_content = base64.b64decode(doc["file_data"])
+    media_type = doc.get("content_type") or "application/octet-stream"
+    headers = {
+        "Content-Disposition": f"attachment; filename={doc.get('file_name', 'document')}"
+    }
     
-    return Response(
-        content=file_content,
-        media_type=doc.get("content_type", "application/octet-stream"),
-        headers={
-            "Content-Disposition": f"attachment; filename={doc.get('file_name', 'document')}"
-        }
-    )
+    if doc.get("file_id"):
+        grid_out = await documents_bucket.open_download_stream(ObjectId(doc["file_id"]))
+        
+        async def file_chunks():
+            while True:
+                chunk = await grid_out.readchunk()
+                if not chunk:
+                    break
+                yield chunk
+        
+        headers["Content-Length"] = str(grid_out.length)
+        return StreamingResponse(file_chunks(), media_type=media_type, headers=headers)
+    
+    # Documents uploaded before the move to GridFS are still stored inline;
+    # decode them a slice at a time so the full file is never held decoded
+    file_data = doc["file_data"]
+    
+    def inline_chunks(slice_size: int = 4 * 16 * 1024):
+        # slice_size is a multiple of 4 so every slice decodes on its own
+        for start in range(0, len(file_data), slice_size):
+            yield base64.b64decode(file_data[start:start + slice_size])
+    
+    return StreamingResponse(inline_chunks(), media_type=media_type, headers=headers)
 
@@ -1,29 +1,66 @@
 """Internal Meeting Management System API Routes"""
 from fastapi import APIRouter, HTTPException, Request
-from typing import List, Optional
-from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional
+from datetime import date, datetime, timezone, timedelta
 from collections import defaultdict
+import asyncio
 import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from pymongo import ReturnDocument, UpdateOne
+from services.cache import TTLCache
+from services.indexes import ensure_index
 
 router = APIRouter(prefix="/meetings", tags=["Meetings"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
+
+
+# Roles that can see and manage every meeting
+ROLES_HR = frozenset({"super_admin", "hr_admin", "hr_executive"})
+
+# Display names of organizers/participants, keyed by employee_id. Renames show
+# up once the entry expires.
+employee_name_cache = TTLCache(ttl=300, maxsize=5000)
+
+# Fields the meeting list cards use; notes and agenda are only loaded by the detail view
+MEETING_LIST_FIELDS = {
+    "_id": 0, "meeting_id": 1, "series_id": 1, "subject": 1, "meeting_date": 1,
+    "start_time": 1, "end_time": 1, "location": 1, "status": 1,
+    "organizer_id": 1, "organizer_employee_id": 1, "organizer_name": 1,
+    "participants": 1, "participant_details": 1,
+    "previous_meeting_id": 1, "next_meeting_id": 1, "next_meeting_date": 1,
+    "follow_up_points.status": 1
+}
+
+# Day names in analytics order, indexed by date.weekday()
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# Content the reminder job never reads
+MEETING_REMINDER_EXCLUDE = {
+    "_id": 0, "agenda_items": 0, "discussion_notes": 0, "follow_up_points": 0,
+    "participant_details": 0
+}
 
 
 async def get_current_user(request: Request) -> dict:
-    from server import get_current_user as auth_get_user
-    return await auth_get_user(request)
+    """Resolve the session user once per request and reuse it from request.state"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        from server import get_current_user as auth_get_user
+        user = request.state.user = await auth_get_user(request)
+    return user
 
 
-async def create_notification(user_id: str, title: str, message: str, 
-                              type: str, module: str, link: str = None,
-                              meeting_id: str = None, notification_type: str = "general"):
-    """Create in-app notification"""
-    notif = {
+def build_notification(user_id: str, title: str, message: str,
+                       type: str, module: str, link: str = None,
+                       meeting_id: str = None, notification_type: str = "general",
+                       now_iso: str = None) -> dict:
+    """Build an in-app notification document"""
+    return {
         "notification_id": f"notif_{uuid.uuid4().hex[:12]}",
         "user_id": user_id,
         "title": title,
@@ -34,18 +71,74 @@ async def create_notification(user_id: str, title: str, message: str,
         "meeting_id": meeting_id,
         "notification_type": notification_type,
         "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now_iso or datetime.now(timezone.utc).isoformat()
     }
+
+
+async def create_notification(user_id: str, title: str, message: str, 
+                              type: str, module: str, link: str = None,
+                              meeting_id: str = None, notification_type: str = "general",
+                              now_iso: str = None):
+    """Create in-app notification"""
+    notif = build_notification(user_id, title, message, type, module, link,
+                               meeting_id, notification_type, now_iso)
     await db.notifications.insert_one(notif)
     return notif
 
 
-async def log_meeting_activity(meeting_id: str, action: str, user_id: str, 
-                                user_name: str, details: dict = None,
-                                field_changed: str = None, old_value: str = None, 
-                                new_value: str = None):
-    """Log activity/changes for a meeting"""
-    activity = {
+async def create_notifications(user_ids: List[str], title: str, message: str,
+                               type: str, module: str, link: str = None,
+                               meeting_id: str = None, notification_type: str = "general",
+                               now_iso: str = None):
+    """Create the same in-app notification for several users in one insert"""
+    now_iso = now_iso or datetime.now(timezone.utc).isoformat()
+    notifs = [
+        build_notification(uid, title, message, type, module, link, meeting_id,
+                           notification_type, now_iso)
+        for uid in user_ids
+    ]
+    if notifs:
+        await db.notifications.insert_many(notifs)
+    return notifs
+
+
+async def get_participant_user_map(employee_ids: List[str], collection: str = "users") -> Dict[str, str]:
+    """Map employee ids to user ids with one $in query, one user per employee.
+    `collection` is the collection holding the employee_id -> user_id link."""
+    if not employee_ids:
+        return {}
+    docs = await db[collection].find(
+        {"employee_id": {"$in": list(employee_ids)}, "user_id": {"$nin": [None, ""]}},
+        {"_id": 0, "employee_id": 1, "user_id": 1}
+    ).to_list(None)
+    user_ids = {}
+    for d in docs:
+        user_ids.setdefault(d["employee_id"], d["user_id"])
+    return user_ids
+
+
+async def get_participant_user_ids(employee_ids: List[str], collection: str = "users") -> List[str]:
+    """Resolve employee ids to user ids, one user per employee"""
+    user_ids = await get_participant_user_map(employee_ids, collection)
+    return list(user_ids.values())
+
+
+async def notify_employees(employee_ids: List[str], title: str, message: str,
+                           type: str, module: str, link: str = None,
+                           meeting_id: str = None, notification_type: str = "general",
+                           collection: str = "users", now_iso: str = None):
+    """Notify the user accounts linked to `employee_ids`"""
+    user_ids = await get_participant_user_ids(employee_ids, collection)
+    return await create_notifications(user_ids, title, message, type, module, link,
+                                      meeting_id, notification_type, now_iso)
+
+
+def build_meeting_activity(meeting_id: str, action: str, user_id: str,
+                           user_name: str, details: dict = None,
+                           field_changed: str = None, old_value: str = None,
+                           new_value: str = None, now_iso: str = None) -> dict:
+    """Build an activity log entry for a meeting"""
+    return {
         "activity_id": f"act_{uuid.uuid4().hex[:12]}",
         "meeting_id": meeting_id,
         "action": action,
@@ -55,12 +148,50 @@ async def log_meeting_activity(meeting_id: str, action: str, user_id: str,
         "old_value": old_value,
         "new_value": new_value,
         "details": details,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now_iso or datetime.now(timezone.utc).isoformat()
     }
+
+
+async def log_meeting_activity(meeting_id: str, action: str, user_id: str, 
+                                user_name: str, details: dict = None,
+                                field_changed: str = None, old_value: str = None, 
+                                new_value: str = None, now_iso: str = None):
+    """Log activity/changes for a meeting"""
+    activity = build_meeting_activity(meeting_id, action, user_id, user_name, details,
+                                      field_changed, old_value, new_value, now_iso)
     await db.meeting_activities.insert_one(activity)
     return activity
 
 
+def meeting_access_filter(meeting_id: str, user: dict, is_hr: bool) -> dict:
+    """Filter matching the meeting only if the user is HR, its organizer or a participant"""
+    query = {"meeting_id": meeting_id}
+    if not is_hr:
+        access = [{"organizer_id": user.get("user_id")}]
+        if user.get("employee_id"):
+            access.append({"participants": user["employee_id"]})
+        query["$or"] = access
+    return query
+
+
+async def raise_meeting_access_error(meeting_id: str):
+    """Explain why an access-filtered write matched nothing"""
+    if not await db.internal_meetings.find_one({"meeting_id": meeting_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    raise HTTPException(status_code=403, detail="Not authorized")
+
+
+async def ensure_indexes():
+    """Create indexes backing the meeting lookups, access filters and listings"""
+    await ensure_index(db.internal_meetings, "meeting_id", unique=True)
+    await ensure_index(db.internal_meetings, [("series_id", 1), ("meeting_date", 1)])
+    await ensure_index(db.internal_meetings, "organizer_id")
+    await ensure_index(db.internal_meetings, "organizer_employee_id")
+    await ensure_index(db.internal_meetings, "participants")
+    await ensure_index(db.internal_meetings, [("meeting_date", 1), ("status", 1)])
+    await ensure_index(db.meeting_activities, [("meeting_id", 1), ("timestamp", -1)])
+
+
 # ==================== MEETINGS CRUD ====================
 
 @router.get("/list")
@@ -69,26 +200,30 @@ async def list_meetings(
     status: Optional[str] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
-    series_id: Optional[str] = None
+    series_id: Optional[str] = None,
+    summary: bool = False
 ):
-    """List meetings for the current user (organized or participant)"""
+    """List meetings for the current user (organized or participant).
+    With summary=true the linked-meeting/name enrichment is skipped."""
     user = await get_current_user(request)
     employee_id = user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     # Build query
     if is_hr:
         # HR can see all meetings
         query = {}
     else:
-        # Regular users see meetings they organize or participate in
-        query = {
-            "$or": [
-                {"organizer_id": user.get("user_id")},
+        # Regular users see meetings they organize or participate in. Each
+        # clause has its own index so the planner unions index scans; clauses
+        # for a missing id are dropped since they would match unset fields.
+        access = [{"organizer_id": user.get("user_id")}]
+        if employee_id:
+            access += [
                 {"organizer_employee_id": employee_id},
                 {"participants": employee_id}
             ]
-        }
+        query = {"$or": access}
     
     if status:
         query["status"] = status
@@ -101,52 +236,98 @@ async def list_meetings(
     if series_id:
         query["series_id"] = series_id
     
-    meetings = await db.internal_meetings.find(query, {"_id": 0}).sort([("meeting_date", 1), ("start_time", 1)]).to_list(500)
+    meetings = await db.internal_meetings.find(query, MEETING_LIST_FIELDS).sort([("meeting_date", 1), ("start_time", 1)]).to_list(500)
     
     # Enrich with participant names
-    for meeting in meetings:
-        await enrich_meeting_data(meeting)
+    if not summary:
+        await enrich_meetings_bulk(meetings)
     
     return meetings
 
 
-async def enrich_meeting_data(meeting: dict):
-    """Add employee names and other enriched data to meeting"""
-    # Get organizer name
-    if meeting.get("organizer_employee_id"):
-        org = await db.employees.find_one({"employee_id": meeting["organizer_employee_id"]}, {"_id": 0})
-        if org:
-            meeting["organizer_name"] = f"{org.get('first_name', '')} {org.get('last_name', '')}".strip()
-    
-    # Get participant names
-    participant_names = []
-    if meeting.get("participants"):
-        for pid in meeting["participants"]:
-            emp = await db.employees.find_one({"employee_id": pid}, {"_id": 0})
-            if emp:
-                participant_names.append({
-                    "employee_id": pid,
-                    "name": f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
-                })
-    meeting["participant_details"] = participant_names
-    
-    # Get previous meeting info if part of series
-    if meeting.get("previous_meeting_id"):
-        prev = await db.internal_meetings.find_one(
-            {"meeting_id": meeting["previous_meeting_id"]}, 
-            {"_id": 0, "subject": 1, "meeting_date": 1}
-        )
-        if prev:
-            meeting["previous_meeting_info"] = prev
+async def get_employee_names(employee_ids) -> Dict[str, str]:
+    """Map employee ids to display names, querying only ids not in the cache"""
+    names = {}
+    missing = []
+    for eid in set(employee_ids):
+        if not eid:
+            continue
+        name = employee_name_cache.get(eid)
+        if name is None:
+            missing.append(eid)
+        else:
+            names[eid] = name
+    if missing:
+        employees = await db.employees.find(
+            {"employee_id": {"$in": missing}},
+            {"_id": 0, "employee_id": 1, "first_name": 1, "last_name": 1}
+        ).to_list(None)
+        for e in employees:
+            name = f"{e.get('first_name', '')} {e.get('last_name', '')}".strip()
+            names[e["employee_id"]] = name
+            employee_name_cache.set(e["employee_id"], name)
+    return names
+
+
+def build_participant_details(participants: List[str], names: Dict[str, str]) -> List[dict]:
+    """Name snapshot for each participant that resolves to an employee"""
+    return [
+        {"employee_id": pid, "name": names[pid]}
+        for pid in participants or []
+        if pid in names
+    ]
+
+
+async def enrich_meetings_bulk(meetings: List[dict]):
+    """Add employee names and linked meeting info to many meetings at once.
+    
+    Names are stored on the meeting (organizer_name, participant_details) when it
+    is created or its participants change; only older meetings without them are
+    resolved here. Employees and linked meetings are each fetched with a single
+    $in query.
+    """
+    emp_ids = set()
+    link_ids = set()
+    for meeting in meetings:
+        if "participant_details" not in meeting:
+            emp_ids.add(meeting.get("organizer_employee_id"))
+            emp_ids.update(meeting.get("participants") or [])
+        for field in ("previous_meeting_id", "next_meeting_id"):
+            if meeting.get(field):
+                link_ids.add(meeting[field])
+    
+    emp_map = await get_employee_names(emp_ids) if emp_ids else {}
+    
+    link_map = {}
+    if link_ids:
+        linked = await db.internal_meetings.find(
+            {"meeting_id": {"$in": list(link_ids)}},
+            {"_id": 0, "meeting_id": 1, "subject": 1, "meeting_date": 1}
+        ).to_list(None)
+        link_map = {m.pop("meeting_id"): m for m in linked}
     
-    # Get follow-up meeting info
-    if meeting.get("next_meeting_id"):
-        next_m = await db.internal_meetings.find_one(
-            {"meeting_id": meeting["next_meeting_id"]}, 
-            {"_id": 0, "subject": 1, "meeting_date": 1}
-        )
+    for meeting in meetings:
+        if "participant_details" not in meeting:
+            # Organizer name
+            org_name = emp_map.get(meeting.get("organizer_employee_id"))
+            if org_name is not None:
+                meeting["organizer_name"] = org_name
+            
+            # Participant names
+            meeting["participant_details"] = build_participant_details(meeting.get("participants"), emp_map)
+        
+        # Previous / follow-up meeting info if part of series
+        prev = link_map.get(meeting.get("previous_meeting_id"))
+        if prev:
+            meeting["previous_meeting_info"] = dict(prev)
+        next_m = link_map.get(meeting.get("next_meeting_id"))
         if next_m:
-            meeting["next_meeting_info"] = next_m
+            meeting["next_meeting_info"] = dict(next_m)
+
+
+async def enrich_meeting_data(meeting: dict):
+    """Add employee names and other enriched data to meeting"""
+    await enrich_meetings_bulk([meeting])
 
 
 @router.post("/create")
@@ -161,8 +342,11 @@ async def create_meeting(data: dict, request: Request):
     if not data.get("start_time"):
         raise HTTPException(status_code=400, detail="Start time is required")
     
+    now_iso = datetime.now(timezone.utc).isoformat()
     meeting_id = f"mtg_{uuid.uuid4().hex[:12]}"
     series_id = data.get("series_id") or f"series_{uuid.uuid4().hex[:8]}"
+    participants = data.get("participants", [])
+    names = await get_employee_names([user.get("employee_id"), *participants])
     
     meeting = {
         "meeting_id": meeting_id,
@@ -172,7 +356,10 @@ async def create_meeting(data: dict, request: Request):
         "start_time": data.get("start_time"),
         "end_time": data.get("end_time", ""),
         "location": data.get("location", ""),
-        "participants": data.get("participants", []),
+        "participants": participants,
+        
+        # Name snapshots so reads need no employee lookup
+        "participant_details": build_participant_details(participants, names),
         
         # Meeting content
         "agenda_items": data.get("agenda_items", []),  # Things to focus on
@@ -190,43 +377,43 @@ async def create_meeting(data: dict, request: Request):
         # Metadata
         "organizer_id": user.get("user_id"),
         "organizer_employee_id": user.get("employee_id"),
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now_iso,
+        "updated_at": now_iso
     }
+    if user.get("employee_id") in names:
+        meeting["organizer_name"] = names[user["employee_id"]]
     
     await db.internal_meetings.insert_one(meeting)
     meeting.pop('_id', None)
     
+    tasks = [
+        # Log activity
+        log_meeting_activity(
+            meeting_id, "created", user.get("user_id"),
+            user.get("name", "Unknown"), 
+            details={"subject": meeting["subject"]},
+            now_iso=now_iso
+        ),
+        # Send notifications to participants
+        notify_employees(
+            meeting.get("participants", []),
+            "Meeting Invitation",
+            f"You've been invited to: {meeting['subject']} on {meeting['meeting_date']} at {meeting['start_time']}",
+            "info", "meetings",
+            link=f"/dashboard/meetings/{meeting_id}",
+            meeting_id=meeting_id,
+            notification_type="meeting_invite",
+            now_iso=now_iso
+        ),
+        enrich_meeting_data(meeting)
+    ]
     # If this is a follow-up meeting, link it to the previous one
     if data.get("previous_meeting_id"):
-        await db.internal_meetings.update_one(
+        tasks.append(db.internal_meetings.update_one(
             {"meeting_id": data["previous_meeting_id"]},
             {"$set": {"next_meeting_id": meeting_id}}
-        )
-    
-    # Log activity
-    await log_meeting_activity(
-        meeting_id, "created", user.get("user_id"),
-        user.get("name", "Unknown"), 
-        details={"subject": meeting["subject"]}
-    )
-    
-    # Send notifications to participants
-    for pid in meeting.get("participants", []):
-        # Look up user by employee_id
-        participant_user = await db.users.find_one({"employee_id": pid}, {"_id": 0, "user_id": 1})
-        if participant_user:
-            await create_notification(
-                participant_user["user_id"],
-                "Meeting Invitation",
-                f"You've been invited to: {meeting['subject']} on {meeting['meeting_date']} at {meeting['start_time']}",
-                "info", "meetings",
-                link=f"/dashboard/meetings/{meeting_id}",
-                meeting_id=meeting_id,
-                notification_type="meeting_invite"
-            )
-    
-    await enrich_meeting_data(meeting)
+        ))
+    await asyncio.gather(*tasks)
     return meeting
 
 
@@ -235,7 +422,7 @@ async def get_meeting(meeting_id: str, request: Request):
     """Get a specific meeting with full details"""
     user = await get_current_user(request)
     employee_id = user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id}, {"_id": 0})
     if not meeting:
@@ -248,12 +435,14 @@ async def get_meeting(meeting_id: str, request: Request):
     if not (is_hr or is_organizer or is_participant):
         raise HTTPException(status_code=403, detail="Not authorized to view this meeting")
     
-    await enrich_meeting_data(meeting)
-    
-    # Get activity log
-    activities = await db.meeting_activities.find(
-        {"meeting_id": meeting_id}, {"_id": 0}
-    ).sort("timestamp", -1).to_list(100)
+    # Enrich and fetch the activity log concurrently; entries logged by one
+    # request share a timestamp, so insertion order breaks the tie
+    _, activities = await asyncio.gather(
+        enrich_meeting_data(meeting),
+        db.meeting_activities.find(
+            {"meeting_id": meeting_id}, {"_id": 0}
+        ).sort([("timestamp", -1), ("_id", -1)]).to_list(100)
+    )
     meeting["activities"] = activities
     
     return meeting
@@ -264,7 +453,7 @@ async def update_meeting(meeting_id: str, data: dict, request: Request):
     """Update meeting details"""
     user = await get_current_user(request)
     employee_id = user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
     if not meeting:
@@ -279,7 +468,8 @@ async def update_meeting(meeting_id: str, data: dict, request: Request):
     
     # Track changes for activity log
     changes = []
-    update_data = {"updated_at": datetime.now(timezone.utc).isoformat()}
+    now_iso = datetime.now(timezone.utc).isoformat()
+    update_data = {"updated_at": now_iso}
     
     # Basic info (only organizer can change)
     if is_organizer or is_hr:
@@ -303,19 +493,21 @@ async def update_meeting(meeting_id: str, data: dict, request: Request):
             new_participants = set(data["participants"])
             newly_added = new_participants - old_participants
             
-            for pid in newly_added:
-                emp = await db.employees.find_one({"employee_id": pid}, {"_id": 0})
-                if emp and emp.get("user_id"):
-                    await create_notification(
-                        emp["user_id"],
-                        "Meeting Invitation",
-                        f"You've been added to: {meeting['subject']}",
-                        "info", "meetings",
-                        meeting_id=meeting_id,
-                        notification_type="meeting_invite"
-                    )
+            await notify_employees(
+                newly_added,
+                "Meeting Invitation",
+                f"You've been added to: {meeting['subject']}",
+                "info", "meetings",
+                meeting_id=meeting_id,
+                notification_type="meeting_invite",
+                collection="employees",
+                now_iso=now_iso
+            )
             
             update_data["participants"] = data["participants"]
+            update_data["participant_details"] = build_participant_details(
+                data["participants"], await get_employee_names(data["participants"])
+            )
         
         if "agenda_items" in data:
             update_data["agenda_items"] = data["agenda_items"]
@@ -333,12 +525,17 @@ async def update_meeting(meeting_id: str, data: dict, request: Request):
     await db.internal_meetings.update_one({"meeting_id": meeting_id}, {"$set": update_data})
     
     # Log changes
-    for field, old_val, new_val in changes:
-        await log_meeting_activity(
+    activities = [
+        build_meeting_activity(
             meeting_id, "updated", user.get("user_id"),
             user.get("name", "Unknown"),
-            field_changed=field, old_value=str(old_val), new_value=str(new_val)
+            field_changed=field, old_value=str(old_val), new_value=str(new_val),
+            now_iso=now_iso
         )
+        for field, old_val, new_val in changes
+    ]
+    if activities:
+        await db.meeting_activities.insert_many(activities)
     
     updated = await db.internal_meetings.find_one({"meeting_id": meeting_id}, {"_id": 0})
     await enrich_meeting_data(updated)
@@ -350,41 +547,35 @@ async def add_discussion_note(meeting_id: str, data: dict, request: Request):
     """Add a discussion note to a meeting"""
     user = await get_current_user(request)
     employee_id = user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
-    
-    meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    # Check access
-    is_organizer = meeting.get("organizer_id") == user.get("user_id")
-    is_participant = employee_id in meeting.get("participants", [])
-    
-    if not (is_hr or is_organizer or is_participant):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    is_hr = user.get("role") in ROLES_HR
     
     if not data.get("content"):
         raise HTTPException(status_code=400, detail="Note content is required")
     
+    now_iso = datetime.now(timezone.utc).isoformat()
     note = {
         "note_id": f"note_{uuid.uuid4().hex[:8]}",
         "content": data.get("content"),
         "added_by": user.get("user_id"),
         "added_by_name": user.get("name", "Unknown"),
         "added_by_employee_id": employee_id,
-        "timestamp": datetime.now(timezone.utc).isoformat()
+        "timestamp": now_iso
     }
     
-    await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
+    # Access is checked by the update filter itself
+    result = await db.internal_meetings.update_one(
+        meeting_access_filter(meeting_id, user, is_hr),
         {"$push": {"discussion_notes": note}}
     )
+    if not result.matched_count:
+        await raise_meeting_access_error(meeting_id)
     
     # Log activity
     await log_meeting_activity(
         meeting_id, "note_added", user.get("user_id"),
         user.get("name", "Unknown"),
-        details={"note_preview": data.get("content")[:100]}
+        details={"note_preview": data.get("content")[:100]},
+        now_iso=now_iso
     )
     
     return note
@@ -395,40 +586,42 @@ async def update_discussion_note(meeting_id: str, note_id: str, data: dict, requ
     """Edit a discussion note"""
     user = await get_current_user(request)
     
-    meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
+    # Fetch only the note being edited
+    meeting = await db.internal_meetings.find_one(
+        {"meeting_id": meeting_id},
+        {"_id": 0, "discussion_notes": {"$elemMatch": {"note_id": note_id}}}
+    )
     if not meeting:
         raise HTTPException(status_code=404, detail="Meeting not found")
     
-    # Find the note
-    notes = meeting.get("discussion_notes", [])
-    note_idx = None
-    old_content = None
-    for i, note in enumerate(notes):
-        if note.get("note_id") == note_id:
-            note_idx = i
-            old_content = note.get("content")
-            break
-    
-    if note_idx is None:
+    if not meeting.get("discussion_notes"):
         raise HTTPException(status_code=404, detail="Note not found")
+    note = meeting["discussion_notes"][0]
+    old_content = note.get("content")
     
     # Only the note author can edit
-    if notes[note_idx].get("added_by") != user.get("user_id"):
+    if note.get("added_by") != user.get("user_id"):
         raise HTTPException(status_code=403, detail="Only the author can edit this note")
     
-    # Update the note
-    notes[note_idx]["content"] = data.get("content")
-    notes[note_idx]["edited_at"] = datetime.now(timezone.utc).isoformat()
-    notes[note_idx]["edit_history"] = notes[note_idx].get("edit_history", [])
-    notes[note_idx]["edit_history"].append({
-        "old_content": old_content,
-        "edited_at": datetime.now(timezone.utc).isoformat()
-    })
-    
+    # Update the note in place
+    now = datetime.now(timezone.utc).isoformat()
+    history_entry = {"old_content": old_content, "edited_at": now}
     await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
-        {"$set": {"discussion_notes": notes}}
+        {
+            "meeting_id": meeting_id,
+            "discussion_notes": {"$elemMatch": {"note_id": note_id, "added_by": user.get("user_id")}}
+        },
+        {
+            "$set": {
+                "discussion_notes.$.content": data.get("content"),
+                "discussion_notes.$.edited_at": now
+            },
+            "$push": {"discussion_notes.$.edit_history": history_entry}
+        }
     )
+    note["content"] = data.get("content")
+    note["edited_at"] = now
+    note["edit_history"] = note.get("edit_history", []) + [history_entry]
     
     # Log activity
     await log_meeting_activity(
@@ -436,40 +629,39 @@ async def update_discussion_note(meeting_id: str, note_id: str, data: dict, requ
         user.get("name", "Unknown"),
         field_changed="discussion_note",
         old_value=old_content[:50] if old_content else "",
-        new_value=data.get("content", "")[:50]
+        new_value=data.get("content", "")[:50],
+        now_iso=now
     )
     
-    return notes[note_idx]
+    return note
 
 
 @router.delete("/{meeting_id}/notes/{note_id}")
 async def delete_discussion_note(meeting_id: str, note_id: str, request: Request):
     """Delete a discussion note"""
     user = await get_current_user(request)
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
-    meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
+    # Only author or HR can delete; the filter enforces it and the pre-image
+    # projection returns just the removed note
+    note_match = {"note_id": note_id}
+    if not is_hr:
+        note_match["added_by"] = user.get("user_id")
+    only_note = {"_id": 0, "discussion_notes": {"$elemMatch": {"note_id": note_id}}}
+    meeting = await db.internal_meetings.find_one_and_update(
+        {"meeting_id": meeting_id, "discussion_notes": {"$elemMatch": note_match}},
+        {"$pull": {"discussion_notes": {"note_id": note_id}}},
+        projection=only_note,
+        return_document=ReturnDocument.BEFORE
+    )
     if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    notes = meeting.get("discussion_notes", [])
-    note_to_delete = None
-    for note in notes:
-        if note.get("note_id") == note_id:
-            note_to_delete = note
-            break
-    
-    if not note_to_delete:
-        raise HTTPException(status_code=404, detail="Note not found")
-    
-    # Only author or HR can delete
-    if note_to_delete.get("added_by") != user.get("user_id") and not is_hr:
+        meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id}, only_note)
+        if not meeting:
+            raise HTTPException(status_code=404, detail="Meeting not found")
+        if not meeting.get("discussion_notes"):
+            raise HTTPException(status_code=404, detail="Note not found")
         raise HTTPException(status_code=403, detail="Not authorized to delete this note")
-    
-    await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
-        {"$pull": {"discussion_notes": {"note_id": note_id}}}
-    )
+    note_to_delete = meeting["discussion_notes"][0]
     
     # Log activity
     await log_meeting_activity(
@@ -492,7 +684,7 @@ async def schedule_followup_meeting(meeting_id: str, data: dict, request: Reques
     
     # Only organizer can schedule follow-up
     if meeting.get("organizer_id") != user.get("user_id"):
-        is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+        is_hr = user.get("role") in ROLES_HR
         if not is_hr:
             raise HTTPException(status_code=403, detail="Only organizer can schedule follow-up")
     
@@ -549,8 +741,9 @@ async def schedule_followup_meeting(meeting_id: str, data: dict, request: Reques
 
 
 @router.get("/{meeting_id}/series")
-async def get_meeting_series(meeting_id: str, request: Request):
-    """Get all meetings in the same series (meeting chain)"""
+async def get_meeting_series(meeting_id: str, request: Request, summary: bool = False):
+    """Get all meetings in the same series (meeting chain).
+    With summary=true the linked-meeting/name enrichment is skipped."""
     user = await get_current_user(request)
     
     meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id}, {"_id": 0})
@@ -565,8 +758,8 @@ async def get_meeting_series(meeting_id: str, request: Request):
         {"series_id": series_id}, {"_id": 0}
     ).sort("meeting_date", 1).to_list(100)
     
-    for m in series:
-        await enrich_meeting_data(m)
+    if not summary:
+        await enrich_meetings_bulk(series)
     
     return series
 
@@ -575,7 +768,7 @@ async def get_meeting_series(meeting_id: str, request: Request):
 async def cancel_meeting(meeting_id: str, request: Request):
     """Cancel a meeting"""
     user = await get_current_user(request)
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
     if not meeting:
@@ -585,33 +778,34 @@ async def cancel_meeting(meeting_id: str, request: Request):
     if meeting.get("organizer_id") != user.get("user_id") and not is_hr:
         raise HTTPException(status_code=403, detail="Only organizer can cancel meeting")
     
-    # Update status instead of deleting
-    await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
-        {"$set": {
-            "status": "cancelled",
-            "cancelled_at": datetime.now(timezone.utc).isoformat(),
-            "cancelled_by": user.get("user_id")
-        }}
-    )
-    
-    # Notify participants
-    for pid in meeting.get("participants", []):
-        emp = await db.employees.find_one({"employee_id": pid}, {"_id": 0})
-        if emp and emp.get("user_id"):
-            await create_notification(
-                emp["user_id"],
-                "Meeting Cancelled",
-                f"Meeting '{meeting['subject']}' on {meeting['meeting_date']} has been cancelled",
-                "warning", "meetings",
-                meeting_id=meeting_id,
-                notification_type="meeting_cancelled"
-            )
-    
-    # Log activity
-    await log_meeting_activity(
-        meeting_id, "cancelled", user.get("user_id"),
-        user.get("name", "Unknown")
+    now_iso = datetime.now(timezone.utc).isoformat()
+    await asyncio.gather(
+        # Update status instead of deleting
+        db.internal_meetings.update_one(
+            {"meeting_id": meeting_id},
+            {"$set": {
+                "status": "cancelled",
+                "cancelled_at": now_iso,
+                "cancelled_by": user.get("user_id")
+            }}
+        ),
+        # Notify participants
+        notify_employees(
+            meeting.get("participants", []),
+            "Meeting Cancelled",
+            f"Meeting '{meeting['subject']}' on {meeting['meeting_date']} has been cancelled",
+            "warning", "meetings",
+            meeting_id=meeting_id,
+            notification_type="meeting_cancelled",
+            collection="employees",
+            now_iso=now_iso
+        ),
+        # Log activity
+        log_meeting_activity(
+            meeting_id, "cancelled", user.get("user_id"),
+            user.get("name", "Unknown"),
+            now_iso=now_iso
+        )
     )
     
     return {"message": "Meeting cancelled"}
@@ -623,20 +817,9 @@ async def cancel_meeting(meeting_id: str, request: Request):
 async def add_followup_point(meeting_id: str, data: dict, request: Request):
     """Add a follow-up point to a meeting"""
     user = await get_current_user(request)
-    employee_id = user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
-    
-    meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    # Check access
-    is_organizer = meeting.get("organizer_id") == user.get("user_id")
-    is_participant = employee_id in meeting.get("participants", [])
-    
-    if not (is_hr or is_organizer or is_participant):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    is_hr = user.get("role") in ROLES_HR
     
+    now_iso = datetime.now(timezone.utc).isoformat()
     followup = {
         "followup_id": f"fu_{uuid.uuid4().hex[:8]}",
         "content": data.get("content"),
@@ -644,19 +827,23 @@ async def add_followup_point(meeting_id: str, data: dict, request: Request):
         "status": "pending",  # pending, completed
         "added_by": user.get("user_id"),
         "added_by_name": user.get("name", "Unknown"),
-        "added_at": datetime.now(timezone.utc).isoformat()
+        "added_at": now_iso
     }
     
-    await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
+    # Access is checked by the update filter itself
+    result = await db.internal_meetings.update_one(
+        meeting_access_filter(meeting_id, user, is_hr),
         {"$push": {"follow_up_points": followup}}
     )
+    if not result.matched_count:
+        await raise_meeting_access_error(meeting_id)
     
     # Log activity
     await log_meeting_activity(
         meeting_id, "followup_added", user.get("user_id"),
         user.get("name", "Unknown"),
-        details={"content": data.get("content", "")[:50]}
+        details={"content": data.get("content", "")[:50]},
+        now_iso=now_iso
     )
     
     return followup
@@ -667,22 +854,17 @@ async def update_followup_status(meeting_id: str, followup_id: str, data: dict,
     """Update follow-up point status (mark as completed)"""
     user = await get_current_user(request)
     
-    meeting = await db.internal_meetings.find_one({"meeting_id": meeting_id})
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-    
-    followups = meeting.get("follow_up_points", [])
-    for i, fu in enumerate(followups):
-        if fu.get("followup_id") == followup_id:
-            followups[i]["status"] = data.get("status", "completed")
-            followups[i]["completed_at"] = datetime.now(timezone.utc).isoformat() if data.get("status") == "completed" else None
-            followups[i]["completed_by"] = user.get("user_id") if data.get("status") == "completed" else None
-            break
-    
-    await db.internal_meetings.update_one(
-        {"meeting_id": meeting_id},
-        {"$set": {"follow_up_points": followups}}
+    completed = data.get("status") == "completed"
+    result = await db.internal_meetings.update_one(
+        {"meeting_id": meeting_id, "follow_up_points.followup_id": followup_id},
+        {"$set": {
+            "follow_up_points.$.status": data.get("status", "completed"),
+            "follow_up_points.$.completed_at": datetime.now(timezone.utc).isoformat() if completed else None,
+            "follow_up_points.$.completed_by": user.get("user_id") if completed else None
+        }}
     )
+    if not result.matched_count and not await db.internal_meetings.find_one({"meeting_id": meeting_id}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Meeting not found")
     
     return {"message": "Follow-up updated"}
 
@@ -699,16 +881,17 @@ async def get_meeting_analytics(
 ):
     """Get comprehensive meeting analytics"""
     user = await get_current_user(request)
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     if not is_hr:
         raise HTTPException(status_code=403, detail="HR/Admin access required")
     
     # Default date range: last 30 days
+    now = datetime.now(timezone.utc)
     if not from_date:
-        from_date = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d")
+        from_date = (now - timedelta(days=30)).date().isoformat()
     if not to_date:
-        to_date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        to_date = now.date().isoformat()
     
     query = {
         "meeting_date": {"$gte": from_date, "$lte": to_date},
@@ -721,90 +904,108 @@ async def get_meeting_analytics(
             {"participants": employee_id}
         ]
     
-    meetings = await db.internal_meetings.find(query, {"_id": 0}).to_list(5000)
+    # Reduce the matching meetings server-side; Python only post-processes the
+    # per-date and per-employee counts
+    previous_meeting_date = {"$lookup": {
+        "from": "internal_meetings",
+        "let": {"prev_id": "$previous_meeting_id"},
+        "pipeline": [
+            {"$match": {"$expr": {"$eq": ["$meeting_id", "$$prev_id"]}}},
+            {"$project": {"_id": 0, "meeting_date": 1}}
+        ],
+        "as": "_prev"
+    }}
+    follow_ups = {"$ifNull": ["$follow_up_points", []]}
+    result = await db.internal_meetings.aggregate([
+        {"$match": query},
+        {"$limit": 5000},
+        {"$facet": {
+            "totals": [{"$group": {
+                "_id": None,
+                "meetings": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+                "followups": {"$sum": {"$size": follow_ups}},
+                "completed_followups": {"$sum": {"$size": {"$filter": {
+                    "input": follow_ups, "as": "fu",
+                    "cond": {"$eq": ["$$fu.status", "completed"]}
+                }}}}
+            }}],
+            "by_date": [{"$group": {"_id": "$meeting_date", "count": {"$sum": 1}}}],
+            "organizers": [
+                {"$match": {"organizer_employee_id": {"$nin": [None, ""]}}},
+                {"$group": {"_id": "$organizer_employee_id", "count": {"$sum": 1}}}
+            ],
+            "attendees": [
+                {"$unwind": "$participants"},
+                {"$group": {"_id": "$participants", "count": {"$sum": 1}}}
+            ],
+            # Average days since the previous meeting of the series; meetings
+            # whose previous meeting is gone ($avg skips the nulls) don't count
+            "series_gaps": [
+                {"$match": {"previous_meeting_id": {"$nin": [None, ""]}}},
+                previous_meeting_date,
+                {"$group": {
+                    "_id": None,
+                    "avg_days": {"$avg": {"$divide": [
+                        {"$subtract": [
+                            {"$dateFromString": {"dateString": "$meeting_date", "onError": None}},
+                            {"$dateFromString": {
+                                "dateString": {"$arrayElemAt": ["$_prev.meeting_date", 0]},
+                                "onError": None
+                            }}
+                        ]},
+                        86400000
+                    ]}}
+                }}
+            ]
+        }}
+    ]).to_list(1)
+    facets = result[0]
+    totals = facets["totals"][0] if facets["totals"] else {}
     
     # Basic stats
-    total_meetings = len(meetings)
-    completed_meetings = sum(1 for m in meetings if m.get("status") == "completed")
+    total_meetings = totals.get("meetings", 0)
+    completed_meetings = totals.get("completed", 0)
     
-    # Meetings by department
-    dept_stats = defaultdict(lambda: {"count": 0, "participants": set()})
+    # Follow-up completion tracking
+    total_followups = totals.get("followups", 0)
+    completed_followups = totals.get("completed_followups", 0)
     
     # Per employee stats
     employee_stats = defaultdict(lambda: {"organized": 0, "attended": 0, "total_hours": 0})
+    for row in facets["organizers"]:
+        employee_stats[row["_id"]]["organized"] = row["count"]
+    for row in facets["attendees"]:
+        employee_stats[row["_id"]]["attended"] = row["count"]
     
-    # Follow-up completion tracking
-    total_followups = 0
-    completed_followups = 0
-    
-    # Meeting frequency by day of week
+    # Meeting frequency by day of week and weekly trend
     day_frequency = defaultdict(int)
-    
-    # Time between meetings in a series
-    series_gaps = []
-    
-    for meeting in meetings:
-        # Day frequency
-        meeting_date = datetime.strptime(meeting["meeting_date"], "%Y-%m-%d")
-        day_frequency[meeting_date.strftime("%A")] += 1
-        
-        # Employee stats
-        org_id = meeting.get("organizer_employee_id")
-        if org_id:
-            employee_stats[org_id]["organized"] += 1
-        
-        for pid in meeting.get("participants", []):
-            employee_stats[pid]["attended"] += 1
-        
-        # Follow-up stats
-        for fu in meeting.get("follow_up_points", []):
-            total_followups += 1
-            if fu.get("status") == "completed":
-                completed_followups += 1
-        
-        # Series gap calculation
-        if meeting.get("previous_meeting_id"):
-            prev = await db.internal_meetings.find_one(
-                {"meeting_id": meeting["previous_meeting_id"]},
-                {"_id": 0, "meeting_date": 1}
-            )
-            if prev:
-                prev_date = datetime.strptime(prev["meeting_date"], "%Y-%m-%d")
-                curr_date = datetime.strptime(meeting["meeting_date"], "%Y-%m-%d")
-                gap = (curr_date - prev_date).days
-                series_gaps.append(gap)
+    weekly_trend = defaultdict(int)
+    for row in facets["by_date"]:
+        meeting_date = date.fromisoformat(row["_id"])
+        day_frequency[WEEKDAYS[meeting_date.weekday()]] += row["count"]
+        week_start = meeting_date - timedelta(days=meeting_date.weekday())
+        weekly_trend[week_start.isoformat()] += row["count"]
     
     # Calculate averages
-    avg_meetings_per_day = total_meetings / max((datetime.strptime(to_date, "%Y-%m-%d") - datetime.strptime(from_date, "%Y-%m-%d")).days, 1)
+    avg_meetings_per_day = total_meetings / max((date.fromisoformat(to_date) - date.fromisoformat(from_date)).days, 1)
     followup_completion_rate = (completed_followups / total_followups * 100) if total_followups > 0 else 0
-    avg_time_between_meetings = sum(series_gaps) / len(series_gaps) if series_gaps else 0
-    
-    # Get top organizers and attendees
-    emp_ids = list(employee_stats.keys())
-    employees = await db.employees.find(
-        {"employee_id": {"$in": emp_ids}},
-        {"_id": 0, "employee_id": 1, "first_name": 1, "last_name": 1, "department": 1}
-    ).to_list(500)
-    emp_map = {e["employee_id"]: e for e in employees}
-    
-    top_organizers = sorted(
-        [{"employee_id": k, "name": f"{emp_map.get(k, {}).get('first_name', '')} {emp_map.get(k, {}).get('last_name', '')}".strip(), **v} 
-         for k, v in employee_stats.items()],
-        key=lambda x: x["organized"], reverse=True
-    )[:10]
-    
-    top_attendees = sorted(
-        [{"employee_id": k, "name": f"{emp_map.get(k, {}).get('first_name', '')} {emp_map.get(k, {}).get('last_name', '')}".strip(), **v}
-         for k, v in employee_stats.items()],
-        key=lambda x: x["attended"], reverse=True
-    )[:10]
-    
-    # Meeting trend (weekly)
-    weekly_trend = defaultdict(int)
-    for meeting in meetings:
-        meeting_date = datetime.strptime(meeting["meeting_date"], "%Y-%m-%d")
-        week_start = meeting_date - timedelta(days=meeting_date.weekday())
-        weekly_trend[week_start.strftime("%Y-%m-%d")] += 1
+    avg_time_between_meetings = (facets["series_gaps"][0]["avg_days"] or 0) if facets["series_gaps"] else 0
+    
+    # Get top organizers and attendees (ties ordered by employee id), then
+    # names for just those employees
+    top_organizer_ids = sorted(employee_stats, key=lambda k: (-employee_stats[k]["organized"], k or ""))[:10]
+    top_attendee_ids = sorted(employee_stats, key=lambda k: (-employee_stats[k]["attended"], k or ""))[:10]
+    names = await get_employee_names(top_organizer_ids + top_attendee_ids)
+    
+    top_organizers = [
+        {"employee_id": k, "name": names.get(k, ""), **employee_stats[k]}
+        for k in top_organizer_ids
+    ]
+    top_attendees = [
+        {"employee_id": k, "name": names.get(k, ""), **employee_stats[k]}
+        for k in top_attendee_ids
+    ]
     
     return {
         "date_range": {"from": from_date, "to": to_date},
@@ -817,8 +1018,8 @@ async def get_meeting_analytics(
             "followup_completion_rate": round(followup_completion_rate, 1),
             "avg_days_between_followup_meetings": round(avg_time_between_meetings, 1)
         },
-        "day_frequency": dict(sorted(day_frequency.items(), key=lambda x: ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"].index(x[0]))),
-        "weekly_trend": dict(sorted(weekly_trend.items())),
+        "day_frequency": {day: day_frequency[day] for day in WEEKDAYS if day in day_frequency},
+        "weekly_trend": {week: weekly_trend[week] for week in sorted(weekly_trend)},
         "top_organizers": top_organizers,
         "top_attendees": top_attendees
     }
@@ -828,44 +1029,72 @@ async def get_meeting_analytics(
 async def get_employee_meeting_stats(employee_id: str, request: Request):
     """Get meeting statistics for a specific employee"""
     user = await get_current_user(request)
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     
     # Employee can view their own stats, HR can view anyone's
     if not is_hr and user.get("employee_id") != employee_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    # Get meetings organized by or participated in by this employee
-    meetings = await db.internal_meetings.find({
-        "$or": [
-            {"organizer_employee_id": employee_id},
-            {"participants": employee_id}
-        ],
-        "status": {"$ne": "cancelled"}
-    }, {"_id": 0}).to_list(500)
-    
-    organized = sum(1 for m in meetings if m.get("organizer_employee_id") == employee_id)
-    attended = sum(1 for m in meetings if employee_id in m.get("participants", []))
+    # Group the employee's meetings by month server-side; only one small row
+    # per month comes back instead of every meeting document
+    my_followups = {"$filter": {
+        "input": {"$ifNull": ["$follow_up_points", []]},
+        "as": "fu",
+        "cond": {"$eq": ["$$fu.assigned_to", employee_id]}
+    }}
+    pipeline = [
+        {"$match": {
+            "$or": [
+                {"organizer_employee_id": employee_id},
+                {"participants": employee_id}
+            ],
+            "status": {"$ne": "cancelled"}
+        }},
+        {"$limit": 500},
+        {"$project": {
+            "_id": 0,
+            "month": {"$substrBytes": ["$meeting_date", 0, 7]},
+            "organized": {"$cond": [{"$eq": ["$organizer_employee_id", employee_id]}, 1, 0]},
+            "attended": {"$cond": [{"$in": [employee_id, {"$ifNull": ["$participants", []]}]}, 1, 0]},
+            "followups": my_followups
+        }},
+        {"$group": {
+            "_id": "$month",
+            "meetings": {"$sum": 1},
+            "organized": {"$sum": "$organized"},
+            "attended": {"$sum": "$attended"},
+            "assigned": {"$sum": {"$size": "$followups"}},
+            "completed": {"$sum": {"$size": {"$filter": {
+                "input": "$followups",
+                "as": "fu",
+                "cond": {"$eq": ["$$fu.status", "completed"]}
+            }}}}
+        }},
+        {"$sort": {"_id": 1}}
+    ]
+    
+    total_meetings = 0
+    organized = 0
+    attended = 0
     
     # Follow-up completion for this employee
     assigned_followups = 0
     completed_assigned = 0
     
-    for meeting in meetings:
-        for fu in meeting.get("follow_up_points", []):
-            if fu.get("assigned_to") == employee_id:
-                assigned_followups += 1
-                if fu.get("status") == "completed":
-                    completed_assigned += 1
-    
     # Monthly trend
-    monthly_trend = defaultdict(int)
-    for meeting in meetings:
-        month = meeting["meeting_date"][:7]
-        monthly_trend[month] += 1
+    monthly_trend = {}
+    
+    async for row in db.internal_meetings.aggregate(pipeline):
+        total_meetings += row["meetings"]
+        organized += row["organized"]
+        attended += row["attended"]
+        assigned_followups += row["assigned"]
+        completed_assigned += row["completed"]
+        monthly_trend[row["_id"]] = row["meetings"]
     
     return {
         "employee_id": employee_id,
-        "total_meetings": len(meetings),
+        "total_meetings": total_meetings,
         "organized": organized,
         "attended": attended,
         "assigned_followups": assigned_followups,
@@ -877,19 +1106,19 @@ async def get_employee_meeting_stats(employee_id: str, request: Request):
 
 # ==================== NOTIFICATIONS ====================
 
-@router.get("/notifications/pending")
-async def get_pending_meeting_notifications(request: Request):
-    """Get meetings that need notification reminders (for background job)"""
-    # This endpoint is for the notification service/background job
+async def find_pending_meeting_notifications() -> List[dict]:
+    """Reminders due for today's scheduled meetings that were not sent yet"""
     now = datetime.now(timezone.utc)
-    today = now.strftime("%Y-%m-%d")
+    today = now.date().isoformat()
     current_time = now.strftime("%H:%M")
     
-    # Find meetings for today that haven't been notified
+    # Find meetings for today that haven't been notified. The notified_* flag
+    # names embed the meeting_id, so drop the bulky content fields instead of
+    # listing the ones to keep
     meetings_today = await db.internal_meetings.find({
         "meeting_date": today,
         "status": "scheduled"
-    }, {"_id": 0}).to_list(200)
+    }, MEETING_REMINDER_EXCLUDE).to_list(200)
     
     notifications_to_send = []
     
@@ -900,8 +1129,7 @@ async def get_pending_meeting_notifications(request: Request):
         
         # Parse meeting time
         try:
-            meeting_datetime = datetime.strptime(f"{today} {start_time}", "%Y-%m-%d %H:%M")
-            meeting_datetime = meeting_datetime.replace(tzinfo=timezone.utc)
+            meeting_datetime = datetime.fromisoformat(f"{today}T{start_time}+00:00")
         except:
             continue
         
@@ -929,49 +1157,59 @@ async def get_pending_meeting_notifications(request: Request):
     return notifications_to_send
 
 
+@router.get("/notifications/pending")
+async def get_pending_meeting_notifications(request: Request):
+    """Get meetings that need notification reminders (for background job)"""
+    # This endpoint is for the notification service/background job
+    return await find_pending_meeting_notifications()
+
+
 @router.post("/notifications/send")
 async def send_meeting_notifications(request: Request):
     """Send meeting notifications (called by background job)"""
-    pending = await get_pending_meeting_notifications(request)
+    pending = await find_pending_meeting_notifications()
+    
+    # Resolve every participant's user account in one query
+    participant_ids = {pid for item in pending for pid in item["meeting"].get("participants", [])}
+    user_by_employee = await get_participant_user_map(list(participant_ids), collection="employees")
     
-    sent_count = 0
+    now_iso = datetime.now(timezone.utc).isoformat()
+    notifs = []
     for item in pending:
         meeting = item["meeting"]
         notif_type = item["type"]
-        message = item["message"]
         
-        # Send to organizer
-        if meeting.get("organizer_id"):
-            await create_notification(
-                meeting["organizer_id"],
+        # Organizer first, then participants
+        recipients = [meeting["organizer_id"]] if meeting.get("organizer_id") else []
+        recipients += [
+            user_by_employee[pid] for pid in meeting.get("participants", [])
+            if pid in user_by_employee
+        ]
+        notifs += [
+            build_notification(
+                uid,
                 "Meeting Reminder",
-                message,
+                item["message"],
                 "info", "meetings",
                 link=f"/dashboard/meetings/{meeting['meeting_id']}",
                 meeting_id=meeting["meeting_id"],
-                notification_type=f"meeting_{notif_type}"
+                notification_type=f"meeting_{notif_type}",
+                now_iso=now_iso
             )
-            sent_count += 1
-        
-        # Send to participants
-        for pid in meeting.get("participants", []):
-            emp = await db.employees.find_one({"employee_id": pid}, {"_id": 0})
-            if emp and emp.get("user_id"):
-                await create_notification(
-                    emp["user_id"],
-                    "Meeting Reminder",
-                    message,
-                    "info", "meetings",
-                    link=f"/dashboard/meetings/{meeting['meeting_id']}",
-                    meeting_id=meeting["meeting_id"],
-                    notification_type=f"meeting_{notif_type}"
-                )
-                sent_count += 1
-        
-        # Mark as notified
-        await db.internal_meetings.update_one(
-            {"meeting_id": meeting["meeting_id"]},
-            {"$set": {f"notified_{notif_type}_{meeting['meeting_id']}": True}}
-        )
+            for uid in recipients
+        ]
+    if notifs:
+        await db.notifications.insert_many(notifs)
+    sent_count = len(notifs)
+    
+    # Mark as notified
+    if pending:
+        await db.internal_meetings.bulk_write([
+            UpdateOne(
+                {"meeting_id": item["meeting"]["meeting_id"]},
+                {"$set": {f"notified_{item['type']}_{item['meeting']['meeting_id']}": True}}
+            )
+            for item in pending
+        ])
     
     return {"sent": sent_count}
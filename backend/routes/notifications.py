@@ -2,19 +2,46 @@
 from fastapi import APIRouter, HTTPException, Request
 from typing import Optional
 from datetime import datetime, timezone
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from services.indexes import ensure_index
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
+
+
+# Fields the notification bell renders (the Notification model in server.py)
+NOTIFICATION_LIST_FIELDS = {
+    "_id": 0, "notification_id": 1, "title": 1, "message": 1, "type": 1,
+    "module": 1, "link": 1, "is_read": 1, "created_at": 1
+}
 
 
 async def get_current_user(request: Request) -> dict:
-    from server import get_current_user as auth_get_user
-    return await auth_get_user(request)
+    """Resolve the session user once per request and reuse it from request.state"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        from server import get_current_user as auth_get_user
+        user = request.state.user = await auth_get_user(request)
+    return user
+
+
+async def ensure_indexes():
+    """Create indexes backing the bell icon list and unread count"""
+    await ensure_index(db.notifications, [("user_id", 1), ("created_at", -1)])
+    await ensure_index(db.notifications, [("user_id", 1), ("is_read", 1), ("created_at", -1)])
+    # Only unread notifications are indexed, so the count stays small however
+    # much read history a user accumulates
+    await ensure_index(
+        db.notifications,
+        [("user_id", 1)],
+        partialFilterExpression={"is_read": False},
+        name="unread_by_user"
+    )
 
 
 @router.get("/list")
@@ -36,7 +63,7 @@ async def list_notifications(
         query["module"] = module
     
     notifications = await db.notifications.find(
-        query, {"_id": 0}
+        query, NOTIFICATION_LIST_FIELDS
     ).sort("created_at", -1).limit(limit).to_list(limit)
     
     return notifications
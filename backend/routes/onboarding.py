@@ -2,20 +2,70 @@
 from fastapi import APIRouter, HTTPException, Request
 from typing import List, Optional
 from datetime import datetime, timezone
-import uuid
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+import secrets
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from services.indexes import ensure_index
 
 router = APIRouter(prefix="/onboarding", tags=["Onboarding & Exit"])
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
+
+
+# Role sets for the access checks: ROLES_ADMIN manages templates, ROLES_HR
+# every employee's onboarding, and ROLES_READ also sees every exit request
+ROLES_ADMIN = frozenset({"super_admin", "hr_admin"})
+ROLES_HR = frozenset({"super_admin", "hr_admin", "hr_executive"})
+ROLES_READ = frozenset({"super_admin", "hr_admin", "hr_executive", "manager"})
 
 
 async def get_current_user(request: Request) -> dict:
-    from server import get_current_user as auth_get_user
-    return await auth_get_user(request)
+    """Resolve the session user once per request and reuse it from request.state"""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        from server import get_current_user as auth_get_user
+        user = request.state.user = await auth_get_user(request)
+    return user
+
+
+async def ensure_indexes():
+    """Create indexes backing the onboarding and exit lookups and listings.
+    Equality keys come first and the sort key last, so lists are returned in
+    index order."""
+    await ensure_index(db.onboarding_tasks, [("employee_id", 1), ("status", 1), ("due_date", 1)])
+    await ensure_index(db.onboarding_tasks, [("employee_id", 1), ("due_date", 1)])
+    await ensure_index(db.onboarding_records, [("employee_id", 1), ("status", 1), ("created_at", -1)])
+    await ensure_index(db.onboarding_records, [("status", 1), ("created_at", -1)])
+    await ensure_index(db.exit_requests, [("employee_id", 1), ("status", 1), ("created_at", -1)])
+    await ensure_index(db.exit_requests, [("status", 1), ("created_at", -1)])
+    await ensure_index(db.onboarding_tasks, "task_id", unique=True)
+    await ensure_index(db.onboarding_records, "onboarding_id", unique=True)
+    await ensure_index(db.exit_requests, "request_id", unique=True)
+    
+    # At most one active exit request per employee. The partial filter is an
+    # equality on the is_active flag, which every supported server accepts
+    # ($in partial filters need MongoDB 6.0+); requests written before the
+    # flag existed are backfilled from their status first
+    await db.exit_requests.update_many(
+        {"status": {"$in": ACTIVE_EXIT_STATUSES}, "is_active": {"$exists": False}},
+        {"$set": {"is_active": True}}
+    )
+    try:
+        await db.exit_requests.drop_index("uniq_active_exit")  # earlier status-based filter
+    except OperationFailure:
+        pass
+    await ensure_index(
+        db.exit_requests,
+        [("employee_id", 1)],
+        unique=True,
+        partialFilterExpression={"is_active": True},
+        name="uniq_active_exit_flag"
+    )
 
 
 # ==================== ONBOARDING ====================
@@ -32,7 +82,7 @@ async def list_onboarding_tasks(
     query = {}
     
     # Non-HR see only their own tasks
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         query["employee_id"] = user.get("employee_id")
     elif employee_id:
         query["employee_id"] = employee_id
@@ -48,11 +98,11 @@ async def list_onboarding_tasks(
 async def create_onboarding_task(data: dict, request: Request):
     """Create onboarding task"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     task = {
-        "task_id": f"onb_{uuid.uuid4().hex[:12]}",
+        "task_id": f"onb_{secrets.token_hex(6)}",
         "employee_id": data.get("employee_id"),
         "title": data.get("title"),
         "description": data.get("description"),
@@ -66,8 +116,8 @@ async def create_onboarding_task(data: dict, request: Request):
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.onboarding_tasks.insert_one(task)
-    task.pop('_id', None)
+    # Insert a copy so the driver's generated _id stays out of the response
+    await db.onboarding_tasks.insert_one({**task})
     return task
 
 
@@ -76,35 +126,41 @@ async def update_onboarding_task(task_id: str, data: dict, request: Request):
     """Update onboarding task"""
     user = await get_current_user(request)
     
-    task = await db.onboarding_tasks.find_one({"task_id": task_id}, {"_id": 0})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Allow task owner or HR to update
-    is_owner = task.get("assigned_to") == user.get("employee_id") or task.get("employee_id") == user.get("employee_id")
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
-    
-    if not (is_owner or is_hr):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    # Allow task owner or HR to update; ownership is part of the update filter
+    query = {"task_id": task_id}
+    if user.get("role") not in ROLES_HR:
+        query["$or"] = [
+            {"assigned_to": user.get("employee_id")},
+            {"employee_id": user.get("employee_id")}
+        ]
     
-    data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    now_iso = datetime.now(timezone.utc).isoformat()
+    data["updated_at"] = now_iso
     if data.get("status") == "completed":
-        data["completed_at"] = datetime.now(timezone.utc).isoformat()
+        data["completed_at"] = now_iso
         data["completed_by"] = user["user_id"]
     
-    await db.onboarding_tasks.update_one({"task_id": task_id}, {"$set": data})
-    return await db.onboarding_tasks.find_one({"task_id": task_id}, {"_id": 0})
+    task = await db.onboarding_tasks.find_one_and_update(
+        query, {"$set": data},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not task:
+        if not await db.onboarding_tasks.find_one({"task_id": task_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Task not found")
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return task
 
 
 @router.post("/templates")
 async def create_onboarding_template(data: dict, request: Request):
     """Create onboarding template"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
+    if user.get("role") not in ROLES_ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     template = {
-        "template_id": f"obtempl_{uuid.uuid4().hex[:10]}",
+        "template_id": f"obtempl_{secrets.token_hex(5)}",
         "name": data.get("name"),
         "description": data.get("description"),
         "tasks": data.get("tasks", []),  # List of task definitions
@@ -114,8 +170,7 @@ async def create_onboarding_template(data: dict, request: Request):
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.onboarding_templates.insert_one(template)
-    template.pop('_id', None)
+    await db.onboarding_templates.insert_one({**template})
     return template
 
 
@@ -123,7 +178,7 @@ async def create_onboarding_template(data: dict, request: Request):
 async def list_onboarding_templates(request: Request):
     """List onboarding templates"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     templates = await db.onboarding_templates.find({"is_active": True}, {"_id": 0}).to_list(50)
@@ -134,21 +189,23 @@ async def list_onboarding_templates(request: Request):
 async def apply_template_to_employee(data: dict, request: Request):
     """Apply onboarding template to new employee"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     template_id = data.get("template_id")
     employee_id = data.get("employee_id")
-    start_date = data.get("start_date", datetime.now(timezone.utc).date().isoformat())
+    now = datetime.now(timezone.utc)
+    start_date = data.get("start_date", now.date().isoformat())
     
     template = await db.onboarding_templates.find_one({"template_id": template_id}, {"_id": 0})
     if not template:
         raise HTTPException(status_code=404, detail="Template not found")
     
+    now_iso = now.isoformat()
     created_tasks = []
     for idx, task_def in enumerate(template.get("tasks", [])):
         task = {
-            "task_id": f"onb_{uuid.uuid4().hex[:12]}",
+            "task_id": f"onb_{secrets.token_hex(6)}",
             "employee_id": employee_id,
             "title": task_def.get("title"),
             "description": task_def.get("description"),
@@ -159,12 +216,13 @@ async def apply_template_to_employee(data: dict, request: Request):
             "priority": task_def.get("priority", "medium"),
             "order": idx + 1,
             "created_by": user["user_id"],
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_iso
         }
-        await db.onboarding_tasks.insert_one(task)
-        task.pop('_id', None)
         created_tasks.append(task)
     
+    if created_tasks:
+        await db.onboarding_tasks.insert_many([{**task} for task in created_tasks])
+    
     return {"message": f"Created {len(created_tasks)} onboarding tasks", "tasks": created_tasks}
 
 
@@ -207,6 +265,14 @@ ONBOARDING_TASK_TEMPLATES = {
     ]
 }
 
+# Every template task with its stage and an empty completion state, in stage
+# order; create_onboarding_record copies these into each new record
+ONBOARDING_RECORD_TASKS = [
+    {**task, "stage": stage, "completed": False, "completed_at": None, "completed_by": None}
+    for stage, tasks in ONBOARDING_TASK_TEMPLATES.items()
+    for task in tasks
+]
+
 
 @router.get("/records")
 async def list_onboarding_records(request: Request, status: Optional[str] = None):
@@ -214,7 +280,7 @@ async def list_onboarding_records(request: Request, status: Optional[str] = None
     user = await get_current_user(request)
     
     query = {}
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         query["employee_id"] = user.get("employee_id")
     
     if status:
@@ -222,9 +288,17 @@ async def list_onboarding_records(request: Request, status: Optional[str] = None
     
     records = await db.onboarding_records.find(query, {"_id": 0}).sort("created_at", -1).to_list(200)
     
-    # Enrich with employee names
+    # Enrich with employee names, fetched in one query
+    emp_ids = list({r.get("employee_id") for r in records})
+    emps = await db.employees.find(
+        {"employee_id": {"$in": emp_ids}},
+        {"_id": 0, "employee_id": 1, "first_name": 1, "last_name": 1, "emp_code": 1}
+    ).to_list(None) if emp_ids else []
+    emp_map = {}
+    for emp in emps:
+        emp_map.setdefault(emp["employee_id"], emp)
     for record in records:
-        emp = await db.employees.find_one({"employee_id": record.get("employee_id")}, {"_id": 0})
+        emp = emp_map.get(record.get("employee_id"))
         if emp:
             record["employee_name"] = f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
             record["emp_code"] = emp.get("emp_code", "")
@@ -237,7 +311,7 @@ async def create_onboarding_record(data: dict, request: Request):
     """Create a new onboarding record for an employee"""
     user = await get_current_user(request)
     
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     employee_id = data.get("employee_id")
@@ -253,24 +327,21 @@ async def create_onboarding_record(data: dict, request: Request):
         raise HTTPException(status_code=400, detail="Employee already has an active onboarding")
     
     # Get employee details
-    employee = await db.employees.find_one({"employee_id": employee_id}, {"_id": 0})
+    employee = await db.employees.find_one(
+        {"employee_id": employee_id},
+        {"_id": 0, "employee_id": 1, "first_name": 1, "last_name": 1, "emp_code": 1,
+         "department_id": 1, "designation_id": 1}
+    )
     if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
     
+    now_iso = datetime.now(timezone.utc).isoformat()
+    
     # Create all tasks for all stages
-    all_tasks = []
-    for stage, tasks in ONBOARDING_TASK_TEMPLATES.items():
-        for task in tasks:
-            all_tasks.append({
-                **task,
-                "stage": stage,
-                "completed": False,
-                "completed_at": None,
-                "completed_by": None
-            })
+    all_tasks = [dict(task) for task in ONBOARDING_RECORD_TASKS]
     
     record = {
-        "onboarding_id": f"onb_{uuid.uuid4().hex[:12]}",
+        "onboarding_id": f"onb_{secrets.token_hex(6)}",
         "employee_id": employee_id,
         "department_id": employee.get("department_id") or data.get("department_id"),
         "designation_id": employee.get("designation_id") or data.get("designation_id"),
@@ -280,12 +351,11 @@ async def create_onboarding_record(data: dict, request: Request):
         "status": "active",
         "tasks": all_tasks,
         "created_by": user["user_id"],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now_iso,
+        "updated_at": now_iso
     }
     
-    await db.onboarding_records.insert_one(record)
-    record.pop('_id', None)
+    await db.onboarding_records.insert_one({**record})
     
     # Add employee name for response
     record["employee_name"] = f"{employee.get('first_name', '')} {employee.get('last_name', '')}".strip()
@@ -304,14 +374,17 @@ async def get_onboarding_record(onboarding_id: str, request: Request):
         raise HTTPException(status_code=404, detail="Onboarding record not found")
     
     # Check access
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
+    is_hr = user.get("role") in ROLES_HR
     is_owner = record.get("employee_id") == user.get("employee_id")
     
     if not (is_hr or is_owner):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     # Add employee name
-    emp = await db.employees.find_one({"employee_id": record.get("employee_id")}, {"_id": 0})
+    emp = await db.employees.find_one(
+        {"employee_id": record.get("employee_id")},
+        {"_id": 0, "first_name": 1, "last_name": 1, "emp_code": 1}
+    )
     if emp:
         record["employee_name"] = f"{emp.get('first_name', '')} {emp.get('last_name', '')}".strip()
         record["emp_code"] = emp.get("emp_code", "")
@@ -324,7 +397,7 @@ async def update_onboarding_stage(onboarding_id: str, data: dict, request: Reque
     """Update the current stage of an onboarding record"""
     user = await get_current_user(request)
     
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive"]:
+    if user.get("role") not in ROLES_HR:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     record = await db.onboarding_records.find_one({"onboarding_id": onboarding_id}, {"_id": 0})
@@ -337,15 +410,16 @@ async def update_onboarding_stage(onboarding_id: str, data: dict, request: Reque
     if new_stage not in valid_stages:
         raise HTTPException(status_code=400, detail="Invalid stage")
     
+    now_iso = datetime.now(timezone.utc).isoformat()
     update_data = {
         "current_stage": new_stage,
-        "updated_at": datetime.now(timezone.utc).isoformat()
+        "updated_at": now_iso
     }
     
     # If stage is completed, mark the record as completed
     if new_stage == "completed":
         update_data["status"] = "completed"
-        update_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+        update_data["completed_at"] = now_iso
     
     await db.onboarding_records.update_one(
         {"onboarding_id": onboarding_id},
@@ -360,42 +434,56 @@ async def update_onboarding_record_task(onboarding_id: str, task_id: str, data:
     """Update a specific task in an onboarding record"""
     user = await get_current_user(request)
     
-    record = await db.onboarding_records.find_one({"onboarding_id": onboarding_id}, {"_id": 0})
-    if not record:
-        raise HTTPException(status_code=404, detail="Onboarding record not found")
-    
-    # Check access
-    is_hr = user.get("role") in ["super_admin", "hr_admin", "hr_executive"]
-    is_owner = record.get("employee_id") == user.get("employee_id")
-    
-    if not (is_hr or is_owner):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    is_hr = user.get("role") in ROLES_HR
     
-    # Find and update the task
-    tasks = record.get("tasks", [])
-    task_found = False
+    # Update just the matching task in place; access is part of the filter
+    query = {"onboarding_id": onboarding_id, "tasks.task_id": task_id}
+    if not is_hr:
+        query["employee_id"] = user.get("employee_id")
     
-    for task in tasks:
-        if task.get("task_id") == task_id:
-            task["completed"] = data.get("completed", False)
-            task["completed_at"] = data.get("completed_at") if data.get("completed") else None
-            task["completed_by"] = user.get("user_id") if data.get("completed") else None
-            task_found = True
-            break
+    completed = data.get("completed", False)
+    result = await db.onboarding_records.update_one(
+        query,
+        {"$set": {
+            "tasks.$.completed": completed,
+            "tasks.$.completed_at": data.get("completed_at") if completed else None,
+            "tasks.$.completed_by": user.get("user_id") if completed else None,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
     
-    if not task_found:
+    if result.matched_count == 0:
+        record = await db.onboarding_records.find_one(
+            {"onboarding_id": onboarding_id}, {"_id": 0, "employee_id": 1}
+        )
+        if not record:
+            raise HTTPException(status_code=404, detail="Onboarding record not found")
+        if not is_hr and record.get("employee_id") != user.get("employee_id"):
+            raise HTTPException(status_code=403, detail="Not authorized")
         raise HTTPException(status_code=404, detail="Task not found")
     
-    await db.onboarding_records.update_one(
-        {"onboarding_id": onboarding_id},
-        {"$set": {"tasks": tasks, "updated_at": datetime.now(timezone.utc).isoformat()}}
-    )
-    
     return {"message": "Task updated"}
 
 
 # ==================== EXIT MANAGEMENT ====================
 
+# Exit request statuses that block submitting another request; requests in
+# these statuses carry is_active: True for the uniq_active_exit_flag index
+ACTIVE_EXIT_STATUSES = ["pending", "approved", "in_notice"]
+
+ACTIVE_EXIT_DETAIL = "Already has an active exit request"
+
+# Departments that sign off an exit clearance
+CLEARANCE_DEPARTMENTS = frozenset({"hr", "it", "finance", "admin", "manager"})
+
+# Roles that can approve, record clearance for and complete exit requests
+APPROVAL_ROLES = frozenset({"super_admin", "hr_admin", "manager"})
+CLEARANCE_ROLES = frozenset({"super_admin", "hr_admin", "hr_executive", "manager", "it_admin", "finance"})
+COMPLETION_ROLES = frozenset({"super_admin", "hr_admin"})
+
+# Exit request fields the employee separation update reads
+SEPARATION_FIELDS = {"_id": 0, "employee_id": 1, "actual_last_day": 1, "reason_category": 1}
+
 @router.get("/exit-requests")
 async def list_exit_requests(
     request: Request,
@@ -406,7 +494,7 @@ async def list_exit_requests(
     
     query = {}
     
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
+    if user.get("role") not in ROLES_READ:
         query["employee_id"] = user.get("employee_id")
     
     if status:
@@ -425,23 +513,26 @@ async def create_exit_request(data: dict, request: Request):
     if not employee_id:
         raise HTTPException(status_code=400, detail="No employee profile")
     
-    # Check if already has pending request
-    existing = await db.exit_requests.find_one({
-        "employee_id": employee_id,
-        "status": {"$in": ["pending", "approved", "in_notice"]}
-    })
+    # Check if already has an active request. The unique index also covers
+    # concurrent submissions, but its build can fail on legacy duplicates
+    existing = await db.exit_requests.find_one(
+        {"employee_id": employee_id, "status": {"$in": ACTIVE_EXIT_STATUSES}},
+        {"_id": 1}
+    )
     if existing:
-        raise HTTPException(status_code=400, detail="Already has an active exit request")
+        raise HTTPException(status_code=400, detail=ACTIVE_EXIT_DETAIL)
     
+    now = datetime.now(timezone.utc)
     exit_request = {
-        "request_id": f"EXIT-{datetime.now().strftime('%Y%m')}-{uuid.uuid4().hex[:6].upper()}",
+        "request_id": f"EXIT-{now.strftime('%Y%m')}-{secrets.token_hex(3).upper()}",
         "employee_id": employee_id,
         "employee_name": user.get("name"),
-        "resignation_date": datetime.now(timezone.utc).date().isoformat(),
+        "resignation_date": now.date().isoformat(),
         "requested_last_day": data.get("requested_last_day"),
         "reason": data.get("reason"),
         "reason_category": data.get("reason_category", "personal"),  # personal, career, relocation, other
         "status": "pending",  # pending, approved, rejected, in_notice, completed, withdrawn
+        "is_active": True,
         "notice_period_days": data.get("notice_period_days", 30),
         "actual_last_day": None,
         "exit_interview_date": None,
@@ -449,11 +540,13 @@ async def create_exit_request(data: dict, request: Request):
         "clearance_status": {},
         "approved_by": None,
         "approved_at": None,
-        "created_at": datetime.now(timezone.utc).isoformat()
+        "created_at": now.isoformat()
     }
     
-    await db.exit_requests.insert_one(exit_request)
-    exit_request.pop('_id', None)
+    try:
+        await db.exit_requests.insert_one({**exit_request})
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=ACTIVE_EXIT_DETAIL)
     return exit_request
 
 
@@ -467,32 +560,63 @@ async def get_exit_request(request_id: str, request: Request):
         raise HTTPException(status_code=404, detail="Exit request not found")
     
     # Check access
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager"]:
+    if user.get("role") not in ROLES_READ:
         if exit_req["employee_id"] != user.get("employee_id"):
             raise HTTPException(status_code=403, detail="Not authorized")
     
     return exit_req
 
 
+def build_approval_update(data: dict, user: dict, now_iso: str) -> dict:
+    """$set document approving an exit request"""
+    return {
+        "status": "approved",
+        "is_active": True,
+        "actual_last_day": data.get("actual_last_day"),
+        "approved_by": user["user_id"],
+        "approved_at": now_iso,
+        "remarks": data.get("remarks")
+    }
+
+
+def build_completion_update(data: dict, now_iso: str) -> dict:
+    """$set document completing an exit request"""
+    return {
+        "status": "completed",
+        "is_active": False,
+        "completed_at": now_iso,
+        "exit_interview_notes": data.get("exit_interview_notes")
+    }
+
+
+async def mark_employee_separated(exit_req: dict, now: datetime):
+    """Record the separation on the employee of a completed exit request"""
+    await db.employees.update_one(
+        {"employee_id": exit_req["employee_id"]},
+        {"$set": {
+            "employment_status": "separated",
+            "separation_date": exit_req.get("actual_last_day") or now.date().isoformat(),
+            "separation_reason": exit_req.get("reason_category")
+        }}
+    )
+
+
 @router.put("/exit-requests/{request_id}/approve")
 async def approve_exit_request(request_id: str, data: dict, request: Request):
     """Approve exit request"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "manager"]:
+    if user.get("role") not in APPROVAL_ROLES:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    actual_last_day = data.get("actual_last_day")
-    
-    await db.exit_requests.update_one(
-        {"request_id": request_id},
-        {"$set": {
-            "status": "approved",
-            "actual_last_day": actual_last_day,
-            "approved_by": user["user_id"],
-            "approved_at": datetime.now(timezone.utc).isoformat(),
-            "remarks": data.get("remarks")
-        }}
-    )
+    # Re-approving a closed request is refused if the employee has since
+    # opened another one
+    try:
+        await db.exit_requests.update_one(
+            {"request_id": request_id},
+            {"$set": build_approval_update(data, user, datetime.now(timezone.utc).isoformat())}
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=ACTIVE_EXIT_DETAIL)
     return {"message": "Exit request approved"}
 
 
@@ -500,13 +624,14 @@ async def approve_exit_request(request_id: str, data: dict, request: Request):
 async def reject_exit_request(request_id: str, data: dict, request: Request):
     """Reject exit request"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "manager"]:
+    if user.get("role") not in APPROVAL_ROLES:
         raise HTTPException(status_code=403, detail="Not authorized")
     
     await db.exit_requests.update_one(
         {"request_id": request_id},
         {"$set": {
             "status": "rejected",
+            "is_active": False,
             "rejected_by": user["user_id"],
             "rejection_reason": data.get("reason"),
             "rejected_at": datetime.now(timezone.utc).isoformat()
@@ -515,86 +640,150 @@ async def reject_exit_request(request_id: str, data: dict, request: Request):
     return {"message": "Exit request rejected"}
 
 
+def build_clearance_update(updates: List[dict], user: dict) -> dict:
+    """$set document recording each department's clearance decision"""
+    now_iso = datetime.now(timezone.utc).isoformat()
+    clearance_update = {}
+    for item in updates:
+        department = item.get("department")
+        if department not in CLEARANCE_DEPARTMENTS:
+            raise HTTPException(status_code=400, detail="Invalid department")
+        clearance_update[f"clearance_status.{department}"] = {
+            "cleared": item.get("cleared", False),
+            "cleared_by": user["user_id"],
+            "cleared_at": now_iso,
+            "remarks": item.get("remarks")
+        }
+    return clearance_update
+
+
 @router.put("/exit-requests/{request_id}/clearance")
 async def update_clearance(request_id: str, data: dict, request: Request):
     """Update exit clearance status"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin", "hr_executive", "manager", "it_admin", "finance"]:
+    if user.get("role") not in CLEARANCE_ROLES:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    department = data.get("department")  # hr, it, finance, admin, manager
-    cleared = data.get("cleared", False)
-    remarks = data.get("remarks")
+    await db.exit_requests.update_one(
+        {"request_id": request_id},
+        {"$set": build_clearance_update([data], user)}
+    )
+    return {"message": f"{data.get('department')} clearance updated"}
+
+
+@router.put("/exit-requests/{request_id}/clearance/bulk")
+async def update_clearance_bulk(request_id: str, data: dict, request: Request):
+    """Update several departments' exit clearance in one write"""
+    user = await get_current_user(request)
+    if user.get("role") not in CLEARANCE_ROLES:
+        raise HTTPException(status_code=403, detail="Not authorized")
     
-    clearance_update = {
-        f"clearance_status.{department}": {
-            "cleared": cleared,
-            "cleared_by": user["user_id"],
-            "cleared_at": datetime.now(timezone.utc).isoformat(),
-            "remarks": remarks
-        }
-    }
+    updates = data.get("updates") or []
+    if not updates:
+        raise HTTPException(status_code=400, detail="No clearance updates given")
     
     await db.exit_requests.update_one(
         {"request_id": request_id},
-        {"$set": clearance_update}
+        {"$set": build_clearance_update(updates, user)}
     )
-    return {"message": f"{department} clearance updated"}
+    return {"message": f"{len(updates)} clearances updated"}
 
 
 @router.put("/exit-requests/{request_id}/complete")
 async def complete_exit(request_id: str, data: dict, request: Request):
     """Mark exit as complete"""
     user = await get_current_user(request)
-    if user.get("role") not in ["super_admin", "hr_admin"]:
+    if user.get("role") not in COMPLETION_ROLES:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    exit_req = await db.exit_requests.find_one({"request_id": request_id}, {"_id": 0})
+    now = datetime.now(timezone.utc)
     
-    # Update exit request
-    await db.exit_requests.update_one(
+    # Update exit request, reading back what the employee update needs
+    exit_req = await db.exit_requests.find_one_and_update(
         {"request_id": request_id},
-        {"$set": {
-            "status": "completed",
-            "completed_at": datetime.now(timezone.utc).isoformat(),
-            "exit_interview_notes": data.get("exit_interview_notes")
-        }}
+        {"$set": build_completion_update(data, now.isoformat())},
+        projection=SEPARATION_FIELDS
     )
     
     # Update employee status
     if exit_req:
-        await db.employees.update_one(
-            {"employee_id": exit_req["employee_id"]},
-            {"$set": {
-                "employment_status": "separated",
-                "separation_date": exit_req.get("actual_last_day") or datetime.now(timezone.utc).date().isoformat(),
-                "separation_reason": exit_req.get("reason_category")
-            }}
-        )
+        await mark_employee_separated(exit_req, now)
     
     return {"message": "Exit completed"}
 
 
-@router.put("/exit-requests/{request_id}/withdraw")
-async def withdraw_exit_request(request_id: str, request: Request):
-    """Withdraw own exit request"""
+@router.put("/exit-requests/{request_id}/batch")
+async def batch_update_exit_request(request_id: str, data: dict, request: Request):
+    """Approve, record clearances for and/or complete an exit request in one write.
+    Body: {"approve": {...}, "clearance": [{...}], "complete": {...}}, each optional;
+    later steps win where they set the same field (e.g. status)."""
     user = await get_current_user(request)
+    role = user.get("role")
     
-    exit_req = await db.exit_requests.find_one({"request_id": request_id}, {"_id": 0})
+    approve = data.get("approve")
+    clearance = data.get("clearance") or []
+    complete = data.get("complete")
+    if approve is None and not clearance and complete is None:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+    
+    if (approve is not None and role not in APPROVAL_ROLES) or \
+            (clearance and role not in CLEARANCE_ROLES) or \
+            (complete is not None and role not in COMPLETION_ROLES):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
+    update = {}
+    if approve is not None:
+        update.update(build_approval_update(approve, user, now_iso))
+    if clearance:
+        update.update(build_clearance_update(clearance, user))
+    if complete is not None:
+        update.update(build_completion_update(complete, now_iso))
+    
+    try:
+        exit_req = await db.exit_requests.find_one_and_update(
+            {"request_id": request_id},
+            {"$set": update},
+            projection=SEPARATION_FIELDS,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail=ACTIVE_EXIT_DETAIL)
     if not exit_req:
         raise HTTPException(status_code=404, detail="Exit request not found")
     
-    if exit_req["employee_id"] != user.get("employee_id"):
-        raise HTTPException(status_code=403, detail="Not authorized")
+    if complete is not None:
+        await mark_employee_separated(exit_req, now)
     
-    if exit_req["status"] not in ["pending", "approved"]:
-        raise HTTPException(status_code=400, detail="Cannot withdraw at this stage")
+    return {"message": "Exit request updated"}
+
+
+@router.put("/exit-requests/{request_id}/withdraw")
+async def withdraw_exit_request(request_id: str, request: Request):
+    """Withdraw own exit request"""
+    user = await get_current_user(request)
     
-    await db.exit_requests.update_one(
-        {"request_id": request_id},
+    result = await db.exit_requests.update_one(
+        {
+            "request_id": request_id,
+            "employee_id": user.get("employee_id"),
+            "status": {"$in": ["pending", "approved"]}
+        },
         {"$set": {
             "status": "withdrawn",
+            "is_active": False,
             "withdrawn_at": datetime.now(timezone.utc).isoformat()
         }}
     )
+    if result.matched_count == 0:
+        # Explain which condition failed
+        exit_req = await db.exit_requests.find_one(
+            {"request_id": request_id}, {"_id": 0, "employee_id": 1, "status": 1}
+        )
+        if not exit_req:
+            raise HTTPException(status_code=404, detail="Exit request not found")
+        if exit_req["employee_id"] != user.get("employee_id"):
+            raise HTTPException(status_code=403, detail="Not authorized")
+        raise HTTPException(status_code=400, detail="Cannot withdraw at this stage")
     return {"message": "Exit request withdrawn"}
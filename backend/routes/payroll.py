@@ -6,8 +6,6 @@ from datetime import datetime, timezone
 from calendar import monthrange
 import uuid
 import io
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
 
 # Import payroll calculation helpers
 from routes.payroll_v2 import (
@@ -19,9 +17,12 @@ from routes.payroll_v2 import (
 router = APIRouter(prefix="/payroll", tags=["Payroll"])
 
 # Get DB from environment
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 
 async def get_current_user(request: Request) -> dict:
@@ -2,7 +2,6 @@
 from fastapi import APIRouter, HTTPException, Request
 from typing import Optional
 from datetime import datetime, timezone
-from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import httpx
 import logging
@@ -11,9 +10,12 @@ router = APIRouter(prefix="/push", tags=["Push Notifications"])
 
 logger = logging.getLogger(__name__)
 
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'test_database')]
+# Database reference - will be set from server.py
+db = None
+
+def set_db(database):
+    global db
+    db = database
 
 FIREBASE_SERVER_KEY = os.environ.get('FIREBASE_SERVER_KEY', '')
 
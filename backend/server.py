@@ -3,7 +3,7 @@ from fastapi.responses import RedirectResponse
 from fastapi.security import HTTPBearer
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from services.compression import JSONGZipMiddleware
 import os
 import logging
 from pathlib import Path
@@ -18,9 +18,21 @@ import httpx
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# Motor runs each driver call on a thread pool sized from MOTOR_MAX_WORKERS
+# (default: 5 x CPU count) when it is first imported, so .env must be loaded
+# before the import for that setting to take effect
+from motor.motor_asyncio import AsyncIOMotorClient
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+    minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', '10')),
+    compressors=os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib'),
+    # Fail fast instead of queueing indefinitely when the pool is exhausted
+    waitQueueTimeoutMS=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -334,6 +346,15 @@ def decode_jwt_token(token: str) -> dict:
         raise HTTPException(status_code=401, detail="Invalid token")
 
 async def get_current_user(request: Request) -> dict:
+    """Resolve the request's user once and reuse it from request.state.
+    Not cached across requests: a logout, deactivation or role change must
+    apply to the very next request on every worker."""
+    user = getattr(request.state, "user", None)
+    if user is None:
+        user = request.state.user = await resolve_current_user(request)
+    return user
+
+async def resolve_current_user(request: Request) -> dict:
     # Check cookie first, then Authorization header
     session_token = request.cookies.get("session_token")
     access_token_cookie = request.cookies.get("access_token")
@@ -3851,35 +3872,57 @@ async def list_expense_categories_shortcut(request: Request):
 
 
 # Import and include additional routers BEFORE mounting api_router to app
-from routes.payroll import router as payroll_router
-from routes.performance import router as performance_router
-from routes.bulk_import import router as import_router
-from routes.documents import router as documents_router
-from routes.assets import router as assets_router
-from routes.expenses import router as expenses_router
-from routes.grievance import router as grievance_router
-from routes.recruitment import router as recruitment_router
-from routes.onboarding import router as onboarding_router
-from routes.reports import router as reports_router
-from routes.labour import router as labour_router
-from routes.user_management import router as user_management_router
-from routes.training import router as training_router
-from routes.travel import router as travel_router, tours_router
+from routes.payroll import router as payroll_router, set_db as set_payroll_db
+from routes.performance import router as performance_router, set_db as set_performance_db
+from routes.bulk_import import router as import_router, set_db as set_import_db
+from routes.documents import router as documents_router, set_db as set_documents_db
+from routes.assets import router as assets_router, set_db as set_assets_db
+from routes.expenses import router as expenses_router, set_db as set_expenses_db
+from routes.grievance import router as grievance_router, set_db as set_grievance_db
+from routes.recruitment import router as recruitment_router, set_db as set_recruitment_db
+from routes.onboarding import router as onboarding_router, set_db as set_onboarding_db, ensure_indexes as ensure_onboarding_indexes
+from routes.reports import router as reports_router, set_db as set_reports_db
+from routes.labour import router as labour_router, set_db as set_labour_db, ensure_indexes as ensure_labour_indexes
+from routes.user_management import router as user_management_router, set_db as set_user_management_db
+from routes.training import router as training_router, set_db as set_training_db
+from routes.travel import router as travel_router, tours_router, set_db as set_travel_db
 from routes.data_management import router as data_management_router, set_db as set_data_management_db
 from routes.biometric import router as biometric_router, set_db as set_biometric_db
-from routes.helpdesk import router as helpdesk_router
-from routes.sop import router as sop_router
-from routes.calendar import router as calendar_router
-from routes.meetings import router as meetings_router
-from routes.events import router as events_router
-from routes.notifications import router as notifications_router
-from routes.push_notifications import router as push_router
+from routes.helpdesk import router as helpdesk_router, set_db as set_helpdesk_db
+from routes.sop import router as sop_router, set_db as set_sop_db
+from routes.calendar import router as calendar_router, set_db as set_calendar_db
+from routes.meetings import router as meetings_router, set_db as set_meetings_db, ensure_indexes as ensure_meetings_indexes
+from routes.events import router as events_router, set_db as set_events_db
+from routes.notifications import router as notifications_router, set_db as set_notifications_db, ensure_indexes as ensure_notifications_indexes
+from routes.push_notifications import router as push_router, set_db as set_push_db
 from services.biometric_sync import set_db as set_biometric_sync_db
+from services.indexes import ensure_index
 
-# Set database for data management and biometric sync
+# Route modules and services share this client's connection pool
 set_data_management_db(db)
+set_labour_db(db)
 set_biometric_db(db)
 set_biometric_sync_db(db)
+set_payroll_db(db)
+set_performance_db(db)
+set_import_db(db)
+set_documents_db(db)
+set_assets_db(db)
+set_expenses_db(db)
+set_grievance_db(db)
+set_recruitment_db(db)
+set_onboarding_db(db)
+set_reports_db(db)
+set_user_management_db(db)
+set_training_db(db)
+set_travel_db(db)
+set_helpdesk_db(db)
+set_sop_db(db)
+set_calendar_db(db)
+set_meetings_db(db)
+set_events_db(db)
+set_notifications_db(db)
+set_push_db(db)
 
 api_router.include_router(payroll_router)
 api_router.include_router(performance_router)
@@ -3906,6 +3949,10 @@ api_router.include_router(notifications_router)
 api_router.include_router(events_router)
 api_router.include_router(push_router)
 
+# Compress buffered JSON responses; small bodies, file downloads and
+# streamed lists are sent as-is
+app.add_middleware(JSONGZipMiddleware, minimum_size=1024)
+
 # CORS Configuration - Starlette native middleware with regex for reliable preflight handling
 app.add_middleware(
     CORSMiddleware,
@@ -3976,6 +4023,36 @@ async def start_scheduler():
     asyncio.create_task(initial_sync())
 
 
+@app.on_event("startup")
+async def create_indexes():
+    """Create MongoDB indexes used by this module and the route modules"""
+    # Employee -> user account links, resolved by the meeting and notification
+    # lookups. Not unique: older data may still hold duplicate employee rows
+    # (see admin cleanup)
+    await ensure_index(db.employees, "employee_id")
+    await ensure_index(db.users, "employee_id")
+    try:
+        await ensure_labour_indexes()
+        logger.info("Labour indexes ensured")
+    except Exception as e:
+        logger.error(f"Error creating labour indexes: {e}")
+    try:
+        await ensure_meetings_indexes()
+        logger.info("Meetings indexes ensured")
+    except Exception as e:
+        logger.error(f"Error creating meetings indexes: {e}")
+    try:
+        await ensure_notifications_indexes()
+        logger.info("Notifications indexes ensured")
+    except Exception as e:
+        logger.error(f"Error creating notifications indexes: {e}")
+    try:
+        await ensure_onboarding_indexes()
+        logger.info("Onboarding indexes ensured")
+    except Exception as e:
+        logger.error(f"Error creating onboarding indexes: {e}")
+
+
 @app.on_event("shutdown")
 async def shutdown_scheduler():
     """Shutdown scheduler gracefully"""
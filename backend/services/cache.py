@@ -0,0 +1,100 @@
+"""
+In-process TTL Cache
+Short-lived cache for hot, read-mostly endpoints (dashboard summaries etc).
+Entries live in the worker process, so every uvicorn worker keeps its own
+copy - keep TTLs short so cross-worker staleness stays acceptable, and clear
+the relevant keys from the write paths that change the cached data.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Dict-backed cache whose entries expire `ttl` seconds after being set.
+    With `stale_ttl`, get_or_set keeps serving an expired value for that many
+    extra seconds while a single background refresh runs."""
+
+    def __init__(self, ttl: float, maxsize: int = 1024, stale_ttl: float = 0):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # Bumped by every clear(); callers that fill the cache themselves
+        # compare it before and after computing to avoid storing stale data
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value, or None if missing or expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        now = time.monotonic()
+        if expires_at < now:
+            if expires_at + self.stale_ttl < now:
+                self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if len(self._data) >= self.maxsize and key not in self._data:
+            self._evict()
+        self._data[key] = (time.monotonic() + self.ttl, value)
+
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, computing it with `factory()` on a miss.
+        Concurrent misses for the same key await one shared computation instead
+        of each hitting the database."""
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            now = time.monotonic()
+            if now <= expires_at:
+                return value
+            if now <= expires_at + self.stale_ttl:
+                self._refresh(key, factory)
+                return value
+        # Shielded so a disconnecting client does not cancel the other waiters
+        return await asyncio.shield(self._refresh(key, factory))
+
+    def clear(self, prefix: str = "") -> None:
+        """Drop every entry, or only string keys starting with `prefix`.
+        In-flight computations for those keys are detached so their (possibly
+        pre-write) results are not stored."""
+        self.generation += 1
+        if not prefix:
+            self._data.clear()
+            self._inflight.clear()
+            return
+        for store in (self._data, self._inflight):
+            for key in [k for k in store if isinstance(k, str) and k.startswith(prefix)]:
+                store.pop(key, None)
+
+    def _refresh(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(key, factory))
+            self._inflight[key] = task
+        return task
+
+    async def _compute(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = asyncio.current_task()
+        try:
+            value = await factory()
+            if self._inflight.get(key) is task:
+                self.set(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+    def _evict(self) -> None:
+        """Drop entries past their stale window, then the oldest ones if still full"""
+        now = time.monotonic()
+        for key in [k for k, (exp, _) in self._data.items() if exp + self.stale_ttl < now]:
+            self._data.pop(key, None)
+        while len(self._data) >= self.maxsize:
+            self._data.pop(next(iter(self._data)))
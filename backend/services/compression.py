@@ -0,0 +1,44 @@
+"""
+JSON Response Compression
+Gzips buffered JSON responses (lists, reports) for clients that accept it.
+File downloads are left alone - worker documents are mostly PDFs and images
+that are already compressed - and so are streamed bodies, which gzip would
+hold back until enough output accumulates.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class JSONGZipMiddleware:
+    """GZipMiddleware restricted to application/json responses with a Content-Length"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, compresslevel: int = 6) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+        responder.send = send
+        compress = False
+
+        async def send_maybe_gzipped(message: Message) -> None:
+            nonlocal compress
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                compress = (
+                    headers.get("content-type", "").startswith("application/json")
+                    and "content-length" in headers
+                )
+            if compress:
+                await responder.send_with_gzip(message)
+            else:
+                await send(message)
+
+        await self.app(scope, receive, send_maybe_gzipped)
@@ -0,0 +1,57 @@
+"""
+Index Creation Helpers
+Startup index builds for the route modules. Each index is created on its own
+so one failing build (e.g. a unique index over legacy duplicate rows) is
+logged without skipping the indexes declared after it.
+"""
+
+import logging
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+async def ensure_index(collection, keys, **kwargs) -> bool:
+    """Create one index on `collection`; log and return False if the build fails"""
+    try:
+        await collection.create_index(keys, **kwargs)
+        return True
+    except PyMongoError as e:
+        logger.error(f"Could not create index {keys} on {collection.name}: {e}")
+        return False
+
+
+def duplicates_pipeline(keys, sort=None) -> list:
+    """Aggregation grouping the documents that share `keys`, one result per
+    duplicated value with the `_id`s in `sort` order"""
+    pipeline = [{"$sort": dict(sort)}] if sort else []
+    pipeline += [
+        {"$group": {
+            "_id": {key: f"${key}" for key in keys},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+    return pipeline
+
+
+async def ensure_unique_index(collection, keys, **kwargs) -> bool:
+    """Create a unique index over `keys` unless existing documents share a value.
+    Duplicates are only counted and logged here; removing them is left to a
+    deliberate migration, never to startup."""
+    for index in (await collection.index_information()).values():
+        if list(index["key"]) == list(keys) and index.get("unique"):
+            return True
+    result = await collection.aggregate(
+        duplicates_pipeline([key for key, _ in keys]) + [{"$count": "groups"}],
+        allowDiskUse=True
+    ).to_list(1)
+    if result and result[0]["groups"]:
+        logger.warning(
+            f"Skipping unique index {keys} on {collection.name}: "
+            f"{result[0]['groups']} key values are held by more than one document"
+        )
+        return False
+    return await ensure_index(collection, keys, unique=True, **kwargs)
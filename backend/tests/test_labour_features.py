@@ -0,0 +1,201 @@
+"""
+Test suite for Contract Labour attendance marking and list pagination
+Tests: bulk attendance (POST /api/labour/attendance/bulk), duplicate handling
+on the unique (worker_id, date) key, re-marking a day with
+POST /api/labour/attendance, and keyset pages (limit/cursor) on the lists
+"""
+import pytest
+import requests
+import os
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://feedback-360.preview.emergentagent.com').rstrip('/')
+SESSION_TOKEN = os.environ.get('TEST_SESSION_TOKEN', '')
+
+# A fixed past date keeps test marks out of today's dashboard counts
+MARK_DATE = "2020-01-15"
+
+
+@pytest.fixture(scope="module")
+def session():
+    """Create authenticated session"""
+    s = requests.Session()
+    s.cookies.set('session_token', SESSION_TOKEN)
+    s.headers.update({'Content-Type': 'application/json'})
+    return s
+
+
+@pytest.fixture(scope="module")
+def auth_check(session):
+    """Verify authentication works"""
+    response = session.get(f"{BASE_URL}/api/auth/me")
+    if response.status_code != 200:
+        pytest.skip("Authentication failed - skipping tests")
+    return response.json()
+
+
+@pytest.fixture(scope="module")
+def labour_setup(session, auth_check):
+    """Create a test contractor with three workers; terminate the workers afterwards"""
+    suffix = datetime.now().strftime("%Y%m%d%H%M%S")
+    response = session.post(f"{BASE_URL}/api/labour/contractors", json={"name": f"TEST_Contractor_{suffix}"})
+    if response.status_code != 200:
+        pytest.skip(f"Could not create contractor: {response.text}")
+    contractor_id = response.json()["contractor_id"]
+
+    worker_ids = []
+    for i in range(3):
+        response = session.post(f"{BASE_URL}/api/labour/workers", json={
+            "contractor_id": contractor_id,
+            "first_name": f"TEST_Worker_{i}",
+            "last_name": suffix
+        })
+        assert response.status_code == 200, response.text
+        worker_ids.append(response.json()["worker_id"])
+
+    yield {"contractor_id": contractor_id, "worker_ids": worker_ids}
+
+    for worker_id in worker_ids:
+        session.put(f"{BASE_URL}/api/labour/workers/{worker_id}/terminate", json={"reason": "test cleanup"})
+
+
+def get_marks(session, worker_id):
+    """Attendance entries of one worker on MARK_DATE"""
+    response = session.get(f"{BASE_URL}/api/labour/attendance", params={"worker_id": worker_id, "date": MARK_DATE})
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestBulkAttendance:
+    """Test POST /api/labour/attendance/bulk"""
+
+    def test_bulk_mark_inserts_all(self, session, labour_setup):
+        """New marks are all inserted"""
+        worker_ids = labour_setup["worker_ids"][:2]
+        response = session.post(f"{BASE_URL}/api/labour/attendance/bulk", json={"records": [
+            {"worker_id": w, "contractor_id": labour_setup["contractor_id"], "date": MARK_DATE}
+            for w in worker_ids
+        ]})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"inserted": 2, "duplicates": 0}
+
+        for worker_id in worker_ids:
+            marks = get_marks(session, worker_id)
+            assert len(marks) == 1
+            assert marks[0]["status"] == "present"
+
+    def test_bulk_mark_skips_existing(self, session, labour_setup):
+        """Workers already marked for the date are counted as duplicates, the rest inserted"""
+        response = session.post(f"{BASE_URL}/api/labour/attendance/bulk", json={"records": [
+            {"worker_id": w, "contractor_id": labour_setup["contractor_id"], "date": MARK_DATE}
+            for w in labour_setup["worker_ids"]
+        ]})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"inserted": 1, "duplicates": 2}
+
+        for worker_id in labour_setup["worker_ids"]:
+            assert len(get_marks(session, worker_id)) == 1
+
+    def test_bulk_mark_duplicate_within_batch(self, session, labour_setup):
+        """A worker listed twice in one batch is stored once"""
+        worker_id = labour_setup["worker_ids"][0]
+        response = session.post(f"{BASE_URL}/api/labour/attendance/bulk", json={"records": [
+            {"worker_id": worker_id, "date": "2020-01-16"},
+            {"worker_id": worker_id, "date": "2020-01-16", "status": "absent"}
+        ]})
+        assert response.status_code == 200, response.text
+        assert response.json() == {"inserted": 1, "duplicates": 1}
+
+    def test_bulk_mark_requires_records(self, session, auth_check):
+        """An empty batch is rejected by validation"""
+        response = session.post(f"{BASE_URL}/api/labour/attendance/bulk", json={"records": []})
+        assert response.status_code == 422
+
+    def test_bulk_mark_requires_worker_id(self, session, auth_check):
+        """Every record needs a worker_id"""
+        response = session.post(f"{BASE_URL}/api/labour/attendance/bulk", json={"records": [{"date": MARK_DATE}]})
+        assert response.status_code == 422
+
+
+class TestSingleAttendance:
+    """Test POST /api/labour/attendance re-marking a day"""
+
+    def test_remark_overwrites_entry(self, session, labour_setup):
+        """Marking a worker again for the same date updates the existing entry"""
+        worker_id = labour_setup["worker_ids"][0]
+        before = get_marks(session, worker_id)
+        assert len(before) == 1
+
+        response = session.post(f"{BASE_URL}/api/labour/attendance", json={
+            "worker_id": worker_id, "date": MARK_DATE, "status": "absent"
+        })
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["status"] == "absent"
+        assert data["attendance_id"] == before[0]["attendance_id"]
+        assert data["created_at"] == before[0]["created_at"]
+
+        after = get_marks(session, worker_id)
+        assert len(after) == 1
+        assert after[0]["status"] == "absent"
+
+    def test_remark_keeps_fields_not_sent(self, session, labour_setup):
+        """Fields left out of a re-mark keep their stored values"""
+        worker_id = labour_setup["worker_ids"][1]
+        response = session.post(f"{BASE_URL}/api/labour/attendance", json={
+            "worker_id": worker_id, "date": MARK_DATE, "status": "half_day", "remarks": "left early"
+        })
+        assert response.status_code == 200, response.text
+        data = response.json()
+        assert data["status"] == "half_day"
+        assert data["remarks"] == "left early"
+        assert data["contractor_id"] == labour_setup["contractor_id"]
+        assert data["overtime_hours"] == 0
+
+
+class TestKeysetPagination:
+    """Test limit/cursor pages on the labour list endpoints"""
+
+    def test_worker_pages_cover_all_once(self, session, labour_setup):
+        """Pages are newest-id first, do not overlap and end with next_cursor None"""
+        params = {"contractor_id": labour_setup["contractor_id"], "limit": 2}
+        response = session.get(f"{BASE_URL}/api/labour/workers", params=params)
+        assert response.status_code == 200, response.text
+        first = response.json()
+        assert len(first["items"]) == 2
+        assert first["next_cursor"] == first["items"][-1]["worker_id"]
+
+        response = session.get(f"{BASE_URL}/api/labour/workers", params={**params, "cursor": first["next_cursor"]})
+        assert response.status_code == 200, response.text
+        second = response.json()
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
+
+        seen = [w["worker_id"] for w in first["items"] + second["items"]]
+        assert seen == sorted(labour_setup["worker_ids"], reverse=True)
+
+    def test_attendance_pages_by_date_then_id(self, session, labour_setup):
+        """Attendance pages use a two-part date|attendance_id cursor"""
+        params = {"contractor_id": labour_setup["contractor_id"], "start": MARK_DATE, "end": MARK_DATE, "limit": 2}
+        response = session.get(f"{BASE_URL}/api/labour/attendance", params=params)
+        assert response.status_code == 200, response.text
+        first = response.json()
+        assert len(first["items"]) == 2
+        last = first["items"][-1]
+        assert first["next_cursor"] == f"{last['date']}|{last['attendance_id']}"
+
+        response = session.get(f"{BASE_URL}/api/labour/attendance", params={**params, "cursor": first["next_cursor"]})
+        assert response.status_code == 200, response.text
+        ids = [a["attendance_id"] for a in first["items"] + response.json()["items"]]
+        assert len(ids) == len(set(ids)) == 3
+
+    def test_limit_is_capped(self, session, auth_check):
+        """limit is clamped to 1..500"""
+        response = session.get(f"{BASE_URL}/api/labour/contractors", params={"limit": 0})
+        assert response.status_code == 200, response.text
+        assert len(response.json()["items"]) <= 1
+
+    def test_invalid_cursor(self, session, auth_check):
+        """A cursor with the wrong number of parts is rejected"""
+        response = session.get(f"{BASE_URL}/api/labour/attendance", params={"limit": 10, "cursor": "2020-01-15"})
+        assert response.status_code == 400
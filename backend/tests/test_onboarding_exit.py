@@ -0,0 +1,194 @@
+"""
+Test suite for Exit Management
+Tests: one active exit request per employee (uniq_active_exit_flag index),
+bulk clearance updates (PUT /api/onboarding/exit-requests/{id}/clearance/bulk)
+and batched approve/clearance updates (PUT /api/onboarding/exit-requests/{id}/batch)
+
+Needs an HR admin session (TEST_SESSION_TOKEN) and a session of an employee
+with an employee profile and no open exit request (TEST_EMPLOYEE_SESSION_TOKEN).
+Every exit request created here is withdrawn again.
+"""
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', 'https://feedback-360.preview.emergentagent.com').rstrip('/')
+SESSION_TOKEN = os.environ.get('TEST_SESSION_TOKEN', '')
+EMPLOYEE_SESSION_TOKEN = os.environ.get('TEST_EMPLOYEE_SESSION_TOKEN', '')
+
+
+def make_session(token):
+    s = requests.Session()
+    s.cookies.set('session_token', token)
+    s.headers.update({'Content-Type': 'application/json'})
+    return s
+
+
+@pytest.fixture(scope="module")
+def session():
+    """Create authenticated HR admin session"""
+    s = make_session(SESSION_TOKEN)
+    response = s.get(f"{BASE_URL}/api/auth/me")
+    if response.status_code != 200:
+        pytest.skip("Authentication failed - skipping tests")
+    return s
+
+
+@pytest.fixture(scope="module")
+def employee_session():
+    """Create authenticated employee session"""
+    if not EMPLOYEE_SESSION_TOKEN:
+        pytest.skip("TEST_EMPLOYEE_SESSION_TOKEN not set - skipping tests")
+    s = make_session(EMPLOYEE_SESSION_TOKEN)
+    response = s.get(f"{BASE_URL}/api/auth/me")
+    if response.status_code != 200 or not response.json().get("employee_id"):
+        pytest.skip("Employee authentication failed - skipping tests")
+    return s
+
+
+@pytest.fixture
+def exit_request(session, employee_session):
+    """Submit an exit request as the employee; withdraw it afterwards"""
+    response = employee_session.post(f"{BASE_URL}/api/onboarding/exit-requests", json={
+        "reason": "TEST_exit_request",
+        "reason_category": "other"
+    })
+    if response.status_code != 200:
+        pytest.skip(f"Could not create exit request: {response.text}")
+    data = response.json()
+    yield data
+    employee_session.put(f"{BASE_URL}/api/onboarding/exit-requests/{data['request_id']}/withdraw")
+
+
+def get_exit_request(session, request_id):
+    response = session.get(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+class TestActiveExitRequest:
+    """Test that an employee has at most one active exit request"""
+
+    def test_new_request_is_active(self, session, exit_request):
+        """A submitted request is pending and flagged active"""
+        assert exit_request["status"] == "pending"
+        assert exit_request["is_active"] is True
+        assert get_exit_request(session, exit_request["request_id"])["is_active"] is True
+
+    def test_second_active_request_rejected(self, employee_session, exit_request):
+        """Submitting again while a request is active fails"""
+        response = employee_session.post(f"{BASE_URL}/api/onboarding/exit-requests", json={"reason": "TEST_second"})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Already has an active exit request"
+
+    def test_withdrawn_request_frees_the_slot(self, session, employee_session, exit_request):
+        """A withdrawn request is inactive and a new one can be submitted"""
+        request_id = exit_request["request_id"]
+        response = employee_session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/withdraw")
+        assert response.status_code == 200, response.text
+        withdrawn = get_exit_request(session, request_id)
+        assert withdrawn["status"] == "withdrawn"
+        assert withdrawn["is_active"] is False
+
+        response = employee_session.post(f"{BASE_URL}/api/onboarding/exit-requests", json={"reason": "TEST_again"})
+        assert response.status_code == 200, response.text
+        new_id = response.json()["request_id"]
+        try:
+            # Re-activating the old request would give the employee two active ones
+            response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/approve", json={})
+            assert response.status_code == 400
+            assert get_exit_request(session, request_id)["status"] == "withdrawn"
+        finally:
+            employee_session.put(f"{BASE_URL}/api/onboarding/exit-requests/{new_id}/withdraw")
+
+    def test_rejected_request_is_inactive(self, session, exit_request):
+        """Rejecting clears the active flag"""
+        request_id = exit_request["request_id"]
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/reject", json={"reason": "TEST"})
+        assert response.status_code == 200, response.text
+        rejected = get_exit_request(session, request_id)
+        assert rejected["status"] == "rejected"
+        assert rejected["is_active"] is False
+
+
+class TestClearanceBulk:
+    """Test PUT /api/onboarding/exit-requests/{id}/clearance/bulk"""
+
+    def test_bulk_clearance_sets_each_department(self, session, exit_request):
+        """Every listed department is recorded in one call"""
+        request_id = exit_request["request_id"]
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/clearance/bulk", json={"updates": [
+            {"department": "hr", "cleared": True},
+            {"department": "it", "cleared": False, "remarks": "laptop pending"}
+        ]})
+        assert response.status_code == 200, response.text
+        assert response.json()["message"] == "2 clearances updated"
+
+        clearance = get_exit_request(session, request_id)["clearance_status"]
+        assert clearance["hr"]["cleared"] is True
+        assert clearance["it"]["cleared"] is False
+        assert clearance["it"]["remarks"] == "laptop pending"
+
+    def test_invalid_department_rejected(self, session, exit_request):
+        """An unknown department fails the whole call"""
+        request_id = exit_request["request_id"]
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/clearance/bulk", json={"updates": [
+            {"department": "hr", "cleared": True},
+            {"department": "canteen", "cleared": True}
+        ]})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid department"
+        assert not get_exit_request(session, request_id).get("clearance_status", {}).get("hr")
+
+    def test_empty_updates_rejected(self, session, exit_request):
+        """A call without updates is rejected"""
+        response = session.put(
+            f"{BASE_URL}/api/onboarding/exit-requests/{exit_request['request_id']}/clearance/bulk",
+            json={"updates": []}
+        )
+        assert response.status_code == 400
+
+    def test_employee_cannot_clear(self, employee_session, exit_request):
+        """Clearance needs a clearance role"""
+        response = employee_session.put(
+            f"{BASE_URL}/api/onboarding/exit-requests/{exit_request['request_id']}/clearance/bulk",
+            json={"updates": [{"department": "hr", "cleared": True}]}
+        )
+        assert response.status_code == 403
+
+
+class TestBatchUpdate:
+    """Test PUT /api/onboarding/exit-requests/{id}/batch"""
+
+    def test_approve_and_clear_in_one_call(self, session, exit_request):
+        """Approval and clearance land together; the request stays active"""
+        request_id = exit_request["request_id"]
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{request_id}/batch", json={
+            "approve": {},
+            "clearance": [{"department": "finance", "cleared": True}]
+        })
+        assert response.status_code == 200, response.text
+
+        updated = get_exit_request(session, request_id)
+        assert updated["status"] == "approved"
+        assert updated["is_active"] is True
+        assert updated["clearance_status"]["finance"]["cleared"] is True
+
+    def test_empty_body_rejected(self, session, exit_request):
+        """A batch without any step is rejected"""
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/{exit_request['request_id']}/batch", json={})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Nothing to update"
+
+    def test_unknown_request(self, session):
+        """An unknown request id gives 404"""
+        response = session.put(f"{BASE_URL}/api/onboarding/exit-requests/exit_doesnotexist/batch", json={"approve": {}})
+        assert response.status_code == 404
+
+    def test_employee_cannot_approve(self, employee_session, exit_request):
+        """Every step in the batch needs its own role"""
+        response = employee_session.put(
+            f"{BASE_URL}/api/onboarding/exit-requests/{exit_request['request_id']}/batch",
+            json={"approve": {}}
+        )
+        assert response.status_code == 403
@@ -0,0 +1,157 @@
+"""
+Test suite for the in-process TTL cache (services/cache.py)
+Tests: expiry, stale-while-revalidate, single-flight recomputation,
+clear(prefix) and the generation counter
+"""
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import services.cache as cache_module
+from services.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for the cache module only"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+class TestExpiry:
+    """get/set honour the TTL"""
+
+    def test_value_served_until_ttl(self, clock):
+        cache = TTLCache(ttl=30)
+        cache.set("k", "v")
+        clock.value += 30
+        assert cache.get("k") == "v"
+
+    def test_value_expires_after_ttl(self, clock):
+        cache = TTLCache(ttl=30)
+        cache.set("k", "v")
+        clock.value += 31
+        assert cache.get("k") is None
+
+    def test_missing_key(self, clock):
+        assert TTLCache(ttl=30).get("nope") is None
+
+    def test_maxsize_evicts_oldest(self, clock):
+        cache = TTLCache(ttl=30, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2 and cache.get("c") == 3
+
+
+class TestGetOrSet:
+    """get_or_set: stale-while-revalidate and single-flight"""
+
+    def test_miss_computes_and_caches(self, clock):
+        cache = TTLCache(ttl=30)
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            return len(calls)
+
+        async def run():
+            return await cache.get_or_set("k", factory), await cache.get_or_set("k", factory)
+
+        assert asyncio.run(run()) == (1, 1)
+        assert len(calls) == 1
+
+    def test_stale_value_served_while_refreshing(self, clock):
+        cache = TTLCache(ttl=30, stale_ttl=60)
+        values = iter(["old", "new"])
+
+        async def factory():
+            return next(values)
+
+        async def run():
+            assert await cache.get_or_set("k", factory) == "old"
+            clock.value += 45  # past ttl, inside the stale window
+            stale = await cache.get_or_set("k", factory)
+            await asyncio.sleep(0)  # let the background refresh finish
+            return stale, cache.get("k")
+
+        assert asyncio.run(run()) == ("old", "new")
+
+    def test_expired_past_stale_window_recomputes(self, clock):
+        cache = TTLCache(ttl=30, stale_ttl=60)
+        values = iter(["old", "new"])
+
+        async def factory():
+            return next(values)
+
+        async def run():
+            await cache.get_or_set("k", factory)
+            clock.value += 91
+            return await cache.get_or_set("k", factory)
+
+        assert asyncio.run(run()) == "new"
+
+    def test_concurrent_misses_share_one_computation(self, clock):
+        cache = TTLCache(ttl=30)
+        calls = []
+
+        async def factory():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "v"
+
+        async def run():
+            return await asyncio.gather(*[cache.get_or_set("k", factory) for _ in range(10)])
+
+        assert asyncio.run(run()) == ["v"] * 10
+        assert len(calls) == 1
+
+
+class TestClear:
+    """clear(prefix) and the generation counter"""
+
+    def test_clear_prefix_keeps_other_keys(self, clock):
+        cache = TTLCache(ttl=30)
+        cache.set("workers:a", 1)
+        cache.set("workers:b", 2)
+        cache.set("contractors:a", 3)
+        cache.clear("workers")
+        assert cache.get("workers:a") is None and cache.get("workers:b") is None
+        assert cache.get("contractors:a") == 3
+
+    def test_clear_all(self, clock):
+        cache = TTLCache(ttl=30)
+        cache.set("a", 1)
+        cache.set(("tuple", "key"), 2)
+        cache.clear()
+        assert cache.get("a") is None and cache.get(("tuple", "key")) is None
+
+    def test_every_clear_bumps_generation(self, clock):
+        cache = TTLCache(ttl=30)
+        start = cache.generation
+        cache.clear("x")
+        cache.clear()
+        assert cache.generation == start + 2
+
+    def test_clear_during_computation_discards_result(self, clock):
+        cache = TTLCache(ttl=30)
+
+        async def factory():
+            await asyncio.sleep(0.01)
+            return "pre-write"
+
+        async def run():
+            pending = asyncio.ensure_future(cache.get_or_set("k", factory))
+            await asyncio.sleep(0)
+            cache.clear("k")  # a write lands while the value is computed
+            return await pending
+
+        assert asyncio.run(run()) == "pre-write"
+        assert cache.get("k") is None
@@ -165,7 +165,7 @@ const MeetingsPage = () => {
     try {
       const authHeaders = getAuthHeaders();
       const [meetingsRes, employeesRes] = await Promise.all([
-        fetch(`${API_URL}/meetings/list`, { credentials: 'include', headers: authHeaders }),
+        fetch(`${API_URL}/meetings/list?summary=true`, { credentials: 'include', headers: authHeaders }),
         fetch(`${API_URL}/employees`, { credentials: 'include', headers: authHeaders })
       ]);
 